@@ -8,7 +8,7 @@ Run: python3 add_indian_data.py
 import asyncio
 import random
 import sys
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 from pathlib import Path
 
 # Add backend to path
@@ -25,8 +25,13 @@ from models.user import User
 from models.patient_task import PatientTask
 from models.task_response import TaskResponse
 from models.analytics_log import AnalyticsLog
+from models.student_stats import StudentStats
 from core.config import settings
-from core.security import get_password_hash
+from services.leaderboard_service import LeaderboardService
+from utils.datagen import PasswordHashCache, build_task, insert_chunked, insert_tasks_with_events
+
+# Status mix with more completed tasks for better rankings
+STATUS_WEIGHTS = [0.10, 0.15, 0.70, 0.05]  # pending, accepted, completed, rejected
 
 # Indian student names
 INDIAN_STUDENT_NAMES = [
@@ -49,35 +54,6 @@ INDIAN_PATIENT_NAMES = [
     "Mr. Gopal Chaturvedi", "Mrs. Leela Saxena", "Mr. Balaji Tiwari", "Mrs. Savitri Mishra"
 ]
 
-# Task titles (same as existing)
-TASK_TITLES = [
-    "Post-operative Physiotherapy Plan",
-    "Cardiac Rehabilitation Assessment",
-    "Pediatric Development Evaluation",
-    "Geriatric Balance Assessment",
-    "Sports Injury Rehabilitation",
-    "Neurological Assessment Protocol",
-    "Respiratory Care Plan",
-    "Orthopedic Treatment Plan",
-    "Mental Health Evaluation",
-    "Chronic Pain Management"
-]
-
-# Complaints (same as existing)
-COMPLAINTS = [
-    "Post-op knee replacement recovery",
-    "Post-MI cardiac rehabilitation",
-    "Delayed motor development",
-    "Recent falls, balance issues",
-    "ACL reconstruction recovery",
-    "Stroke rehabilitation",
-    "Chronic obstructive pulmonary disease",
-    "Hip fracture recovery",
-    "Anxiety and depression",
-    "Lower back pain management"
-]
-
-
 async def add_indian_data():
     """Add new data with Indian names to MongoDB"""
     print("=" * 60)
@@ -91,7 +67,7 @@ async def add_indian_data():
         client = AsyncIOMotorClient(settings.mongodb_url)
         await init_beanie(
             database=client[settings.mongodb_db_name],
-            document_models=[User, PatientTask, TaskResponse, AnalyticsLog]
+            document_models=[User, PatientTask, TaskResponse, AnalyticsLog, StudentStats]
         )
         print("✅ Connected to MongoDB\n")
     except Exception as e:
@@ -99,6 +75,10 @@ async def add_indian_data():
         print("\n💡 Check your MongoDB URL in backend/.env")
         return
     
+    hashes = PasswordHashCache()
+    rng = random.Random()
+    now = datetime.now(timezone.utc)
+    
     # Get or create admin user
     admin = await User.find_one(User.email == "admin@institute.edu")
     if not admin:
@@ -106,7 +86,7 @@ async def add_indian_data():
         admin = User(
             name="Dr. Rajesh Kumar",
             email="admin@institute.edu",
-            password_hash=get_password_hash("admin123"),
+            password_hash=await hashes.hash("admin123"),
             role="admin"
         )
         await admin.insert()
@@ -127,27 +107,24 @@ async def add_indian_data():
     
     # Select random Indian names
     selected_names = random.sample(INDIAN_STUDENT_NAMES, num_new_students)
-    new_students = []
+    emails = [f"student{existing_count + i:02d}@student.edu" for i in range(1, num_new_students + 1)]
     
-    for i, name in enumerate(selected_names, 1):
-        student_num = existing_count + i
-        email = f"student{student_num:02d}@student.edu"
-        
-        # Check if email already exists
-        existing = await User.find_one(User.email == email)
-        if existing:
+    # Check which emails already exist with one query
+    taken = {u.email for u in await User.find({"email": {"$in": emails}}).to_list()}
+    student_hash = await hashes.hash("student123")
+    new_students = []
+    for i, (name, email) in enumerate(zip(selected_names, emails), 1):
+        if email in taken:
             print(f"  ⚠️  Student {email} already exists, skipping...")
             continue
-        
-        student = User(
+        new_students.append(User(
             name=name,
             email=email,
-            password_hash=get_password_hash("student123"),
+            password_hash=student_hash,
             role="student"
-        )
-        await student.insert()
-        new_students.append(student)
+        ))
         print(f"  ✅ Created student {i}/{num_new_students}: {email} ({name})")
+    await insert_chunked(new_students)
     
     print(f"\n✅ Created {len(new_students)} new students\n")
     
@@ -155,73 +132,22 @@ async def add_indian_data():
     print("📊 Ensuring all students have completed tasks for rankings...")
     all_students = existing_students + new_students
     
-    # Add additional completed tasks to ensure rankings work
-    for student in all_students:
-        student_id = str(student.id)
-        # Check how many completed tasks this student has
-        completed_count = await PatientTask.find(
-            PatientTask.assigned_student_id == student_id,
-            PatientTask.status == "completed",
-            PatientTask.quality_score != None
-        ).count()
-        
-        # If student has less than 3 completed tasks, add more
-        if completed_count < 3:
-            needed = 3 - completed_count
-            for _ in range(needed):
-                title = random.choice(TASK_TITLES)
-                patient_name = random.choice(INDIAN_PATIENT_NAMES)
-                complaint = random.choice(COMPLAINTS)
-                age = random.randint(8, 85)
-                days_ago = random.randint(1, 90)
-                created_date = datetime.now(timezone.utc) - timedelta(days=days_ago)
-                
-                quality_score = round(random.uniform(3.0, 5.0), 1)
-                task = PatientTask(
-                    title=title,
-                    description=f"Comprehensive assessment and treatment plan for {complaint.lower()}",
-                    patient={
-                        "name": patient_name,
-                        "age": age,
-                        "primary_complaint": complaint,
-                        "notes": random.choice([None, "Follow-up needed", "Patient requires special attention"])
-                    },
-                    assigned_student_id=student_id,
-                    status="completed",
-                    quality_score=quality_score,
-                    created_at=created_date,
-                    completed_at=created_date + timedelta(days=random.randint(1, 7))
-                )
-                await task.insert()
-                
-                # Create task responses (accepted then completed)
-                accept_time = created_date + timedelta(hours=random.randint(1, 24))
-                await TaskResponse(
-                    task_id=str(task.id),
-                    student_id=student_id,
-                    action="accepted",
-                    reject_reason=None,
-                    timestamp=accept_time
-                ).insert()
-                
-                complete_time = created_date + timedelta(days=random.randint(1, 7))
-                await TaskResponse(
-                    task_id=str(task.id),
-                    student_id=student_id,
-                    action="completed",
-                    reject_reason=None,
-                    timestamp=complete_time
-                ).insert()
-                
-                # Log analytics
-                await AnalyticsLog(
-                    user_id=admin_id,
-                    task_id=str(task.id),
-                    role="admin",
-                    action="task_completed",
-                    timestamp=complete_time,
-                    metadata={"title": title, "score": quality_score}
-                ).insert()
+    # Count scored completed tasks for every student in one aggregation
+    completed_counts = {
+        row["_id"]: row["count"]
+        for row in await PatientTask.aggregate([
+            {"$match": {"status": "completed", "quality_score": {"$ne": None}}},
+            {"$group": {"_id": "$assigned_student_id", "count": {"$sum": 1}}}
+        ]).to_list()
+    }
+    
+    # If a student has less than 3 completed tasks, add more
+    topup_tasks = [
+        build_task(rng, str(student.id), now, status="completed", patient_names=INDIAN_PATIENT_NAMES)
+        for student in all_students
+        for _ in range(max(0, 3 - completed_counts.get(str(student.id), 0)))
+    ]
+    await insert_tasks_with_events(rng, topup_tasks, admin_id)
     
     print(f"✅ Ensured all students have completed tasks\n")
     
@@ -232,126 +158,35 @@ async def add_indian_data():
     print("📝 Creating tasks with Indian patient names...")
     print()
     
-    task_count = 0
-    completed_count = 0
+    # Create 3-8 tasks per student
+    student_names = {str(s.id): s.name for s in all_students}
+    tasks = [
+        build_task(
+            rng, str(student.id), now,
+            status_weights=STATUS_WEIGHTS,
+            patient_names=INDIAN_PATIENT_NAMES
+        )
+        for student in all_students
+        for _ in range(rng.randint(3, 8))
+    ]
+    await insert_tasks_with_events(rng, tasks, admin_id)
     
-    for student in all_students:
-        student_id = str(student.id)
-        student_name = student.name
-        
-        # Create 3-8 tasks per student
-        num_tasks = random.randint(3, 8)
-        
-        for i in range(num_tasks):
-            # Random status distribution - ensure more completed tasks for rankings
-            status_rand = random.random()
-            if status_rand < 0.70:  # 70% completed (increased for better rankings)
-                status = "completed"
-            elif status_rand < 0.85:  # 15% accepted
-                status = "accepted"
-            elif status_rand < 0.95:  # 10% pending
-                status = "pending"
-            else:  # 5% rejected
-                status = "rejected"
-            
-            # Random task details with Indian patient names
-            title = random.choice(TASK_TITLES)
-            patient_name = random.choice(INDIAN_PATIENT_NAMES)
-            complaint = random.choice(COMPLAINTS)
-            age = random.randint(8, 85)
-            
-            # Create task with random date in last 90 days
-            days_ago = random.randint(1, 90)
-            created_date = datetime.now(timezone.utc) - timedelta(days=days_ago)
-            
-            task = PatientTask(
-                title=title,
-                description=f"Comprehensive assessment and treatment plan for {complaint.lower()}",
-                patient={
-                    "name": patient_name,
-                    "age": age,
-                    "primary_complaint": complaint,
-                    "notes": random.choice([
-                        None,
-                        "Patient requires special attention",
-                        "Follow-up needed",
-                        "Family history of similar conditions",
-                        "Previous treatment history available"
-                    ])
-                },
-                assigned_student_id=student_id,
-                status=status,
-                created_at=created_date
-            )
-            
-            # Add quality score if completed
-            if status == "completed":
-                quality_score = round(random.uniform(3.0, 5.0), 1)
-                task.quality_score = quality_score
-                task.completed_at = created_date + timedelta(days=random.randint(1, 7))
-            
-            await task.insert()
-            task_count += 1
-            
-            # Create task response for all non-pending tasks (required for acceptance rate calculation)
-            if status != "pending":
-                response_time = created_date + timedelta(hours=random.randint(1, 48))
-                
-                # For completed tasks, also create an "accepted" response first (workflow)
-                if status == "completed":
-                    # First accept the task
-                    accept_time = created_date + timedelta(hours=random.randint(1, 24))
-                    await TaskResponse(
-                        task_id=str(task.id),
-                        student_id=student_id,
-                        action="accepted",
-                        reject_reason=None,
-                        timestamp=accept_time
-                    ).insert()
-                    # Then complete it
-                    await TaskResponse(
-                        task_id=str(task.id),
-                        student_id=student_id,
-                        action="completed",
-                        reject_reason=None,
-                        timestamp=response_time
-                    ).insert()
-                else:
-                    # For accepted/rejected, create single response
-                    await TaskResponse(
-                        task_id=str(task.id),
-                        student_id=student_id,
-                        action=status,
-                        reject_reason=random.choice([
-                            "Too busy with other assignments",
-                            "Not my area of specialization",
-                            "Schedule conflict",
-                            "Need more time to prepare"
-                        ]) if status == "rejected" else None,
-                        timestamp=response_time
-                    ).insert()
-            
-            # Log analytics
-            log_time = created_date
-            if status == "completed":
-                log_time = task.completed_at or created_date
-            
-            await AnalyticsLog(
-                user_id=admin_id if status == "completed" else student_id,
-                task_id=str(task.id),
-                role="admin" if status == "completed" else "student",
-                action=f"task_{status}",
-                timestamp=log_time,
-                metadata={"title": title, "score": task.quality_score} if status == "completed" else {}
-            ).insert()
-            
-            if status == "completed":
-                completed_count += 1
-                print(f"  ✅ {student_name}: {title} - {patient_name} (Score: {task.quality_score})")
-            elif status == "pending":
-                print(f"  📋 {student_name}: {title} - {patient_name} (Pending)")
-            else:
-                print(f"  📝 {student_name}: {title} - {patient_name} (Status: {status})")
+    task_count = len(tasks)
+    completed_count = 0
+    for task in tasks:
+        student_name = student_names[task.assigned_student_id]
+        patient_name = task.patient["name"]
+        if task.status == "completed":
+            completed_count += 1
+            print(f"  ✅ {student_name}: {task.title} - {patient_name} (Score: {task.quality_score})")
+        elif task.status == "pending":
+            print(f"  📋 {student_name}: {task.title} - {patient_name} (Pending)")
+        else:
+            print(f"  📝 {student_name}: {task.title} - {patient_name} (Status: {task.status})")
+    
+    # Tasks were written directly, so recompute the leaderboard in one pass
+    await LeaderboardService.rebuild()
+    print("\n✅ Rebuilt student leaderboard")
     
     print()
     print("=" * 60)
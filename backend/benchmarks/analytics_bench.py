@@ -0,0 +1,298 @@
+"""
+Benchmarks for the analytics and task list service calls on generated datasets.
+Each call is timed (p50/p95/p99) and run once more under tracemalloc for allocations;
+results are written as JSON so runs can be compared across releases.
+Run with: python -m benchmarks.analytics_bench --scale 10k [--in-memory] [--compare old.json]
+"""
+import argparse
+import asyncio
+import json
+import math
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from motor.motor_asyncio import AsyncIOMotorClient
+from beanie import init_beanie
+from models.user import User
+from models.patient_task import PatientTask
+from models.task_response import TaskResponse
+from models.analytics_log import AnalyticsLog
+from models.session import Session
+from models.student_stats import StudentStats
+from core.config import settings
+from services.analytics_service import AnalyticsService
+from services.task_service import TaskService
+from utils.datagen import DEFAULT_CHUNK_SIZE, generate_dataset, insert_chunked
+
+# students, tasks
+SCALES = {
+    "1k": (1_000, 20_000),
+    "10k": (10_000, 200_000),
+    "100k": (100_000, 2_000_000)
+}
+
+RESULTS_DIR = Path(__file__).parent / "results"
+SAMPLE_STUDENTS = 50
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def measure(call: Callable[[int], Awaitable[Any]], iterations: int, warmup: int) -> Dict[str, Any]:
+    """Time a call (it receives the iteration number) and record one traced run's allocations"""
+    for i in range(warmup):
+        await call(i)
+    
+    durations = []
+    for i in range(iterations):
+        started = time.perf_counter()
+        await call(i)
+        durations.append((time.perf_counter() - started) * 1000)
+    durations.sort()
+    
+    # Tracing slows everything down, so allocations come from a separate run
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        await call(iterations)
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    
+    return {
+        "iterations": iterations,
+        "mean_ms": round(sum(durations) / len(durations), 3),
+        "p50_ms": round(percentile(durations, 50), 3),
+        "p95_ms": round(percentile(durations, 95), 3),
+        "p99_ms": round(percentile(durations, 99), 3),
+        "max_ms": round(durations[-1], 3),
+        "alloc_peak_bytes": peak - before,
+        "alloc_retained_bytes": after - before
+    }
+
+
+def build_cases(student_ids: List[str]) -> Dict[str, Callable[[int], Awaitable[Any]]]:
+    """Benchmark name -> call; per-student calls rotate through the sampled students"""
+    def student(i: int) -> str:
+        return student_ids[i % len(student_ids)]
+    
+    return {
+        "analytics.rankings": lambda i: AnalyticsService.get_student_rankings(),
+        "analytics.admin": lambda i: AnalyticsService.get_admin_analytics(),
+        "analytics.student": lambda i: AnalyticsService.get_student_analytics(student(i)),
+        "tasks.admin_page": lambda i: TaskService.get_admin_tasks(limit=50),
+        "tasks.admin_page_summary": lambda i: TaskService.get_admin_tasks(limit=50, summary=True),
+        "tasks.admin_page_completed": lambda i: TaskService.get_admin_tasks(limit=50, status="completed"),
+        "tasks.student": lambda i: TaskService.get_student_tasks(student(i)),
+        "tasks.student_summary": lambda i: TaskService.get_student_tasks(student(i), summary=True)
+    }
+
+
+async def connect(mongo_url: str, db_name: str, in_memory: bool):
+    """Connect to mongod, or to mongomock-motor when in_memory is set"""
+    if in_memory:
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            raise SystemExit("--in-memory needs mongomock-motor: pip install mongomock-motor")
+        client = AsyncMongoMockClient()
+    else:
+        client = AsyncIOMotorClient(mongo_url, serverSelectionTimeoutMS=5000)
+    await init_beanie(
+        database=client[db_name],
+        document_models=[User, PatientTask, TaskResponse, AnalyticsLog, Session, StudentStats]
+    )
+    return client
+
+
+async def build_student_stats(chunk_size: int) -> None:
+    """Build student_stats in Python; mongomock-motor has no $merge for LeaderboardService.rebuild"""
+    counters: Dict[str, Dict[str, float]] = {}
+    
+    def row(student_id: str) -> Dict[str, float]:
+        return counters.setdefault(student_id, {
+            "tasks_completed": 0, "total_score": 0.0, "total_responses": 0, "accepted_responses": 0
+        })
+    
+    scored = await PatientTask.get_motor_collection().find(
+        {"status": "completed", "quality_score": {"$ne": None}},
+        {"assigned_student_id": 1, "quality_score": 1}
+    ).to_list(None)
+    for task in scored:
+        counts = row(task["assigned_student_id"])
+        counts["tasks_completed"] += 1
+        counts["total_score"] += task["quality_score"]
+    
+    responses = await TaskResponse.get_motor_collection().find({}, {"student_id": 1, "action": 1}).to_list(None)
+    for response in responses:
+        counts = row(response["student_id"])
+        counts["total_responses"] += 1
+        if response["action"] == "accepted":
+            counts["accepted_responses"] += 1
+    
+    await insert_chunked([
+        StudentStats(
+            student_id=student_id,
+            average_score=c["total_score"] / c["tasks_completed"] if c["tasks_completed"] else 0,
+            acceptance_rate=c["accepted_responses"] / c["total_responses"] * 100 if c["total_responses"] else 0,
+            **c
+        )
+        for student_id, c in counters.items()
+    ], chunk_size)
+
+
+async def prepare_dataset(
+    client,
+    db_name: str,
+    students: int,
+    tasks: int,
+    seed: int,
+    chunk_size: int,
+    reuse: bool,
+    in_memory: bool
+) -> None:
+    """Generate the dataset unless --reuse finds one of the expected size already there"""
+    if reuse:
+        existing_students = await User.find(User.role == "student").count()
+        existing_tasks = await PatientTask.count()
+        if existing_students == students and existing_tasks == tasks:
+            print(f"♻️  Reusing {students} students and {tasks} tasks in {db_name}")
+            return
+    
+    for model in (User, PatientTask, TaskResponse, AnalyticsLog, Session, StudentStats):
+        await model.get_motor_collection().delete_many({})
+    
+    print(f"🌱 Generating {students} students and {tasks} tasks (seed {seed})...")
+    started = time.perf_counter()
+    await generate_dataset(students, tasks, seed=seed, chunk_size=chunk_size, rebuild_leaderboard=not in_memory)
+    if in_memory:
+        await build_student_stats(chunk_size)
+    print(f"✅ Dataset ready in {time.perf_counter() - started:.1f}s")
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare(report: Dict[str, Any], baseline_path: Path, threshold: float) -> List[str]:
+    """Names of benchmarks whose p95 grew by more than threshold versus a baseline report"""
+    baseline = json.loads(baseline_path.read_text())["results"]
+    regressions = []
+    for name, result in report["results"].items():
+        previous = baseline.get(name)
+        if not previous or "p95_ms" not in previous or "p95_ms" not in result:
+            continue
+        ratio = result["p95_ms"] / previous["p95_ms"] if previous["p95_ms"] else 1.0
+        result["p95_vs_baseline"] = round(ratio, 3)
+        if ratio > threshold:
+            regressions.append(f"{name}: p95 {previous['p95_ms']}ms -> {result['p95_ms']}ms ({ratio:.2f}x)")
+    return regressions
+
+
+async def run(args) -> int:
+    students, tasks = SCALES[args.scale]
+    students = args.students or students
+    tasks = args.tasks or tasks
+    
+    client = await connect(args.mongo_url, args.db, args.in_memory)
+    try:
+        await prepare_dataset(
+            client, args.db, students, tasks, args.seed, args.chunk_size, args.reuse, args.in_memory
+        )
+        
+        # Sample students deterministically so every run hits the same documents
+        students_by_email = await User.find(User.role == "student").sort(+User.email).to_list()
+        student_ids = [str(u.id) for u in students_by_email]
+        sample = random.Random(args.seed).sample(student_ids, min(SAMPLE_STUDENTS, len(student_ids)))
+        
+        results = {}
+        for name, call in build_cases(sample).items():
+            if args.only and not any(name.startswith(prefix) for prefix in args.only):
+                continue
+            try:
+                results[name] = await measure(call, args.iterations, args.warmup)
+                print(f"  ⏱️  {name}: p50 {results[name]['p50_ms']}ms, p95 {results[name]['p95_ms']}ms, "
+                      f"p99 {results[name]['p99_ms']}ms")
+            except Exception as e:
+                # In-memory stand-ins do not support every aggregation stage
+                results[name] = {"error": f"{type(e).__name__}: {e}"}
+                print(f"  ❌ {name}: {e}")
+    finally:
+        client.close()
+    
+    report = {
+        "meta": {
+            "scale": args.scale,
+            "students": students,
+            "tasks": tasks,
+            "seed": args.seed,
+            "iterations": args.iterations,
+            "warmup": args.warmup,
+            "backend": "mongomock-motor" if args.in_memory else "mongod",
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "created_at": datetime.utcnow().isoformat()
+        },
+        "results": results
+    }
+    
+    regressions = compare(report, Path(args.compare), args.threshold) if args.compare else []
+    
+    output = Path(args.output) if args.output else (
+        RESULTS_DIR / f"{args.scale}-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"📄 Report written to {output}")
+    
+    for line in regressions:
+        print(f"  ⚠️  Regression {line}")
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark analytics and task queries")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="1k")
+    parser.add_argument("--students", type=int, help="Override the scale's student count")
+    parser.add_argument("--tasks", type=int, help="Override the scale's task count")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--mongo-url", default=settings.mongodb_url)
+    parser.add_argument("--db", default=f"{settings.mongodb_db_name}_bench",
+                        help="Database to (re)generate; it is wiped unless --reuse matches")
+    parser.add_argument("--in-memory", action="store_true", help="Use mongomock-motor instead of mongod")
+    parser.add_argument("--reuse", action="store_true", help="Keep an existing dataset of the same size")
+    parser.add_argument("--only", nargs="*", help="Run only benchmarks with these name prefixes")
+    parser.add_argument("--output", help="Report path (default benchmarks/results/<scale>-<time>.json)")
+    parser.add_argument("--compare", help="Baseline report to compare p95 latencies against")
+    parser.add_argument("--threshold", type=float, default=1.2,
+                        help="p95 ratio over the baseline that counts as a regression")
+    args = parser.parse_args()
+    
+    if args.db == settings.mongodb_db_name:
+        raise SystemExit("Refusing to benchmark against the application database; pass another --db")
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
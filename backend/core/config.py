@@ -19,12 +19,52 @@ class Settings(BaseSettings):
     
     # Session Authentication (Simple token-based, no JWT)
     session_expiry_hours: int = 24  # Session expires after 24 hours
+    session_cache_enabled: bool = True  # Cache token -> user lookups in-process
+    session_cache_ttl_seconds: int = 300  # Max staleness after a revocation on another worker
+    session_cache_max_size: int = 10000
+    user_name_cache_size: int = 10000  # id -> name entries kept for task enrichment
+    user_name_cache_ttl_seconds: int = 300  # Only invalidation: max staleness after a rename or delete
+    max_sessions_per_user: int = 10  # Oldest sessions are evicted beyond this (0 = unlimited)
+    session_sweep_interval_seconds: int = 0  # Background expiry sweep; 0 relies on the TTL index
     
     
+    # Migrations
+    task_type_backfill_on_startup: bool = True  # Resumable; only tasks missing task_type are touched
+    task_type_backfill_batch_size: int = 1000
+    
     # Security
     bcrypt_rounds: int = 12
+    password_hash_concurrency: int = 4  # Max bcrypt calls running in parallel off the event loop
     rate_limit_per_minute: int = 60
     
+    # Audit logging: opt in to buffering AnalyticsLog entries and writing them in batches
+    analytics_log_async: bool = False  # Off: each entry is written before the request returns
+    analytics_log_queue_size: int = 10000  # Entries beyond this are dropped (and counted)
+    analytics_log_batch_size: int = 100
+    analytics_log_flush_interval_seconds: float = 1.0
+    
+    # Analytics result cache (per worker; TaskService writes mark entries stale)
+    result_cache_enabled: bool = True
+    result_cache_max_age_seconds: float = 30.0  # Upper bound on staleness from other workers' writes
+    result_cache_stale_seconds: float = 300.0  # Serve stale results this long while recomputing
+    result_cache_max_entries: int = 1000
+    
+    # Conditional GETs: ETags from data versions, 304 on If-None-Match
+    etag_enabled: bool = True
+    etag_max_age_seconds: int = 30  # Tags roll over this often to pick up other workers' writes
+    
+    # Server-Sent Events for task and leaderboard updates
+    events_enabled: bool = True
+    events_backend: str = "local"  # local (single worker) or mongo (change stream; needs a replica set)
+    events_queue_size: int = 100  # Per client; a client further behind is told to resync
+    events_heartbeat_seconds: int = 15
+    events_ticket_ttl_seconds: int = 30  # Single-use stream tickets must be redeemed within this
+    events_session_check_seconds: int = 60  # Open streams re-validate their session this often
+    events_leaderboard_coalesce_seconds: float = 5  # At most one leaderboard_updated per window
+    
+    # Metrics: per-route latency and MongoDB command timings on /metrics
+    metrics_enabled: bool = True
+    
     # Logging
     log_level: str = "INFO"  # DEBUG, INFO, WARNING, ERROR, CRITICAL
     log_format: str = "json"  # json, text
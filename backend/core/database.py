@@ -1,11 +1,15 @@
 from motor.motor_asyncio import AsyncIOMotorClient
 from beanie import init_beanie
 from core.config import settings
+from core.metrics import mongo_listener
 from models.user import User
 from models.patient_task import PatientTask
 from models.task_response import TaskResponse
 from models.analytics_log import AnalyticsLog
 from models.session import Session
+from models.student_stats import StudentStats
+from models.task_event import TaskEvent
+from models.stream_ticket import StreamTicket
 import ssl
 
 
@@ -19,6 +23,7 @@ db = Database()
 async def connect_to_mongo():
     """Create database connection with SSL/TLS support for MongoDB Atlas"""
     mongodb_url = settings.mongodb_url
+    event_listeners = [mongo_listener] if settings.metrics_enabled else []
     
     # Check if using MongoDB Atlas (mongodb+srv://)
     if mongodb_url.startswith("mongodb+srv://"):
@@ -29,6 +34,7 @@ async def connect_to_mongo():
             serverSelectionTimeoutMS=30000,  # Increased timeout
             connectTimeoutMS=30000,
             socketTimeoutMS=30000,
+            event_listeners=event_listeners,
             # Let Motor handle SSL automatically for mongodb+srv://
         )
     else:
@@ -36,6 +42,7 @@ async def connect_to_mongo():
         db.client = AsyncIOMotorClient(
             mongodb_url,
             serverSelectionTimeoutMS=5000,
+            event_listeners=event_listeners,
         )
     
     # Test connection
@@ -47,13 +54,25 @@ async def connect_to_mongo():
         print(f"   Connection URL: {mongodb_url[:50]}...")
         raise
     
+    await drop_legacy_session_indexes(db.client[settings.mongodb_db_name])
+    
     await init_beanie(
         database=db.client[settings.mongodb_db_name],
-        document_models=[User, PatientTask, TaskResponse, AnalyticsLog, Session]
+        document_models=[User, PatientTask, TaskResponse, AnalyticsLog, Session, StudentStats, TaskEvent, StreamTicket]
     )
     print(f"✅ Connected to MongoDB database: {settings.mongodb_db_name}")
 
 
+async def drop_legacy_session_indexes(database):
+    """Drop the old plain expires_at index so the TTL index on the same key can be created"""
+    collection = database[Session.Settings.name]
+    indexes = await collection.index_information()
+    legacy = indexes.get("expires_at_1")
+    if legacy and "expireAfterSeconds" not in legacy:
+        await collection.drop_index("expires_at_1")
+        print("✅ Replaced sessions.expires_at index with a TTL index")
+
+
 async def close_mongo_connection():
     """Close database connection"""
     if db.client:
@@ -2,23 +2,75 @@ from fastapi import Depends, HTTPException, status, Header
 from typing import Optional
 from models.user import User
 from models.session import Session
+from core.session_cache import get_session_cache
+from beanie import PydanticObjectId
 from datetime import datetime
 
 
-async def get_current_user(
+def _user_from_snapshot(snapshot: dict) -> User:
+    """Rebuild a (read-only) User from a cached snapshot without validation"""
+    return User.model_construct(
+        id=PydanticObjectId(snapshot["id"]),
+        name=snapshot["name"],
+        email=snapshot["email"],
+        role=snapshot["role"]
+    )
+
+
+async def _resolve_session(token: str) -> Optional[dict]:
+    """Resolve a token to its session and user snapshot in one round trip"""
+    pipeline = [
+        {"$match": {"token": token}},
+        {"$limit": 1},
+        {
+            "$lookup": {
+                "from": User.Settings.name,
+                "let": {
+                    "user_id": {"$convert": {"input": "$user_id", "to": "objectId", "onError": None}}
+                },
+                "pipeline": [
+                    {"$match": {"$expr": {"$eq": ["$_id", "$$user_id"]}}},
+                    {"$project": {"name": 1, "email": 1, "role": 1}}
+                ],
+                "as": "user"
+            }
+        },
+        {
+            "$project": {
+                "expires_at": 1,
+                "user": {"$arrayElemAt": ["$user", 0]}
+            }
+        }
+    ]
+    results = await Session.aggregate(pipeline).to_list()
+    return results[0] if results else None
+
+
+async def get_session_token(
     authorization: Optional[str] = Header(None)
-) -> User:
-    """Get current authenticated user from session token"""
+) -> str:
+    """Extract the bearer session token from the Authorization header"""
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Missing or invalid authorization header",
         )
     
-    token = authorization.replace("Bearer ", "")
+    return authorization.replace("Bearer ", "")
+
+
+async def get_current_user(
+    token: str = Depends(get_session_token)
+) -> User:
+    """Get current authenticated user from session token"""
+    # Cache hit: no database round trips
+    cache = get_session_cache()
+    cached = await cache.get(token)
+    if cached:
+        return _user_from_snapshot(cached["user"])
     
-    # Find session
-    session = await Session.find_one(Session.token == token)
+    # Find session and its user together
+    session = await _resolve_session(token)
     
     if not session:
         raise HTTPException(
@@ -27,22 +79,28 @@ async def get_current_user(
         )
     
     # Check if session expired
-    if session.expires_at < datetime.utcnow():
-        await session.delete()
+    if session["expires_at"] < datetime.utcnow():
+        await Session.find(Session.id == session["_id"]).delete()
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Session expired",
         )
     
-    # Get user
-    user = await User.get(session.user_id)
+    user = session.get("user")
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
         )
     
-    return user
+    snapshot = {
+        "id": str(user["_id"]),
+        "name": user["name"],
+        "email": user["email"],
+        "role": user["role"]
+    }
+    await cache.set(token, {"user": snapshot, "expires_at": session["expires_at"]})
+    return _user_from_snapshot(snapshot)
 
 
 async def get_current_admin(
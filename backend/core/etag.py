@@ -0,0 +1,67 @@
+import hashlib
+import secrets
+import time
+from typing import Any, Optional
+from fastapi import Request, Response
+from core.config import settings
+
+# Versions are per process, so tags from another worker or an earlier run never match
+_EPOCH = secrets.token_hex(8)
+
+
+def compute_etag(request: Request, *parts: Any) -> str:
+    """Strong ETag from the request path and query, the given data versions and a time window.
+    
+    The window (etag_max_age_seconds) bounds how long a tag can survive writes made
+    by other workers, whose version bumps this process never sees.
+    """
+    window = int(time.time() // settings.etag_max_age_seconds)
+    raw = "|".join(str(p) for p in (_EPOCH, window, request.url.path, request.url.query, *parts))
+    return '"' + hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(candidate.strip().removeprefix("W/") == etag for candidate in header.split(","))
+
+
+def _headers(etag: str) -> dict:
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+
+def not_modified_response(request: Request, *parts: Any) -> Optional[Response]:
+    """Return a 304 to send instead when the client's copy matches parts, without tagging.
+    
+    For handlers whose body may be older than the current data version (cached results,
+    error fallbacks): they check with the current versions here, then tag the body they
+    actually return with tag_response.
+    """
+    if not settings.etag_enabled:
+        return None
+    etag = compute_etag(request, *parts)
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=_headers(etag))
+    return None
+
+
+def tag_response(request: Request, response: Response, *parts: Any) -> None:
+    """Set the ETag for the versions the returned body was built from"""
+    if settings.etag_enabled:
+        response.headers.update(_headers(compute_etag(request, *parts)))
+
+
+def conditional_response(request: Request, response: Response, *parts: Any) -> Optional[Response]:
+    """Tag the response; return a 304 to send instead when the client's copy is current.
+    
+    Call before doing any database work so unchanged data costs neither a query nor
+    serialization. parts must cover everything the body depends on besides the URL
+    (data versions, the current user for per-user views).
+    """
+    not_modified = not_modified_response(request, *parts)
+    if not_modified is None:
+        tag_response(request, response, *parts)
+    return not_modified
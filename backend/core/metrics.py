@@ -0,0 +1,145 @@
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+from pymongo import monitoring
+
+# Latency buckets in seconds (Prometheus default buckets)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Mongo commands issued by a single request
+COMMAND_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus data model"""
+    
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+    
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+    
+    def render(self, name: str, labels: str) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f'{name}_bucket{{{labels},le="{le}"}} {cumulative}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+        return lines
+
+
+class RequestStats:
+    """Mongo work done on behalf of one HTTP request"""
+    __slots__ = ("commands", "mongo_seconds")
+    
+    def __init__(self):
+        self.commands = 0
+        self.mongo_seconds = 0.0
+
+
+# Motor runs pymongo in executor threads with a copy of the caller's context, so
+# the listener sees the same (mutable) RequestStats object the middleware set
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+class MetricsRegistry:
+    """Per-route latency and Mongo usage, plus per-command Mongo totals"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latency: Dict[Tuple[str, str], Histogram] = {}
+        self._mongo_commands: Dict[Tuple[str, str], Histogram] = {}
+        self._mongo_latency: Dict[Tuple[str, str], Histogram] = {}
+        self._responses: Dict[Tuple[str, str, str], int] = {}
+        self._commands: Dict[str, List[float]] = {}  # command -> [count, seconds, failures]
+    
+    def observe_request(self, method: str, route: str, status: int, seconds: float, stats: RequestStats) -> None:
+        key = (method, route)
+        with self._lock:
+            if key not in self._latency:
+                self._latency[key] = Histogram(LATENCY_BUCKETS)
+                self._mongo_commands[key] = Histogram(COMMAND_COUNT_BUCKETS)
+                self._mongo_latency[key] = Histogram(LATENCY_BUCKETS)
+            self._latency[key].observe(seconds)
+            self._mongo_commands[key].observe(stats.commands)
+            self._mongo_latency[key].observe(stats.mongo_seconds)
+            status_key = (method, route, f"{status // 100}xx")
+            self._responses[status_key] = self._responses.get(status_key, 0) + 1
+    
+    def observe_command(self, command: str, seconds: float, failed: bool) -> None:
+        with self._lock:
+            totals = self._commands.setdefault(command, [0, 0.0, 0])
+            totals[0] += 1
+            totals[1] += seconds
+            if failed:
+                totals[2] += 1
+            stats = _request_stats.get()
+            if stats is not None:
+                stats.commands += 1
+                stats.mongo_seconds += seconds
+    
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        with self._lock:
+            for name, help_text, series in (
+                ("http_request_duration_seconds", "Request latency by route", self._latency),
+                ("http_request_mongo_commands", "MongoDB commands issued per request", self._mongo_commands),
+                ("http_request_mongo_duration_seconds", "Time spent in MongoDB per request", self._mongo_latency),
+            ):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} histogram")
+                for (method, route), histogram in sorted(series.items()):
+                    lines.extend(histogram.render(name, f'method="{method}",route="{route}"'))
+            
+            lines.append("# HELP http_responses_total Responses by route and status class")
+            lines.append("# TYPE http_responses_total counter")
+            for (method, route, status), count in sorted(self._responses.items()):
+                lines.append(f'http_responses_total{{method="{method}",route="{route}",status="{status}"}} {count}')
+            
+            for name, help_text, index in (
+                ("mongodb_commands_total", "MongoDB commands by name", 0),
+                ("mongodb_command_duration_seconds_total", "Time spent in MongoDB commands by name", 1),
+                ("mongodb_command_failures_total", "Failed MongoDB commands by name", 2),
+            ):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} counter")
+                for command, totals in sorted(self._commands.items()):
+                    lines.append(f'{name}{{command="{command}"}} {totals[index]}')
+        return "\n".join(lines) + "\n"
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    """Feeds MongoDB command timings into the registry and the current request's stats"""
+    
+    def __init__(self, registry: MetricsRegistry):
+        self.registry = registry
+    
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        pass
+    
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self.registry.observe_command(event.command_name, event.duration_micros / 1_000_000, failed=False)
+    
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self.registry.observe_command(event.command_name, event.duration_micros / 1_000_000, failed=True)
+
+
+def start_request() -> Tuple[RequestStats, float]:
+    """Begin tracking a request; returns its stats object and start time"""
+    stats = RequestStats()
+    _request_stats.set(stats)
+    return stats, time.perf_counter()
+
+
+registry = MetricsRegistry()
+mongo_listener = MongoCommandListener(registry)
@@ -1,6 +1,18 @@
+import asyncio
 import secrets
 import bcrypt
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from core.config import settings
+
+
+# bcrypt is CPU-bound (~250ms at 12 rounds); run it off the event loop in a bounded pool
+_password_executor = ThreadPoolExecutor(
+    max_workers=settings.password_hash_concurrency,
+    thread_name_prefix="bcrypt"
+)
+_password_semaphore = None
+_password_stats = {"waiting": 0, "running": 0, "completed": 0, "max_waiting": 0}
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -21,11 +33,45 @@ def get_password_hash(password: str) -> str:
     """Hash a password using bcrypt directly"""
     # Bcrypt has 72 byte limit, but our passwords are short
     password_bytes = password.encode('utf-8')
-    salt = bcrypt.gensalt(rounds=12)
+    salt = bcrypt.gensalt(rounds=settings.bcrypt_rounds)
     hashed = bcrypt.hashpw(password_bytes, salt)
     return hashed.decode('utf-8')
 
 
+async def _run_password_job(func, *args):
+    """Run a bcrypt call in the password pool, queueing beyond the concurrency limit"""
+    global _password_semaphore
+    if _password_semaphore is None:
+        _password_semaphore = asyncio.Semaphore(settings.password_hash_concurrency)
+    
+    _password_stats["waiting"] += 1
+    _password_stats["max_waiting"] = max(_password_stats["max_waiting"], _password_stats["waiting"])
+    async with _password_semaphore:
+        _password_stats["waiting"] -= 1
+        _password_stats["running"] += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(_password_executor, func, *args)
+        finally:
+            _password_stats["running"] -= 1
+            _password_stats["completed"] += 1
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password without blocking the event loop"""
+    return await _run_password_job(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password without blocking the event loop"""
+    return await _run_password_job(get_password_hash, password)
+
+
+def password_hash_stats() -> dict:
+    """Queue depth and throughput of the password hashing pool"""
+    return {"concurrency": settings.password_hash_concurrency, **_password_stats}
+
+
 def generate_session_token() -> str:
     """Generate a simple random session token"""
     return secrets.token_urlsafe(32)
@@ -34,4 +80,3 @@ def generate_session_token() -> str:
 def get_session_expiry() -> datetime:
     """Get session expiry time (24 hours)"""
     return datetime.utcnow() + timedelta(hours=24)
-
@@ -0,0 +1,120 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional, Set
+from core.config import settings
+
+
+class SessionCacheBackend(ABC):
+    """Token -> user snapshot cache used by get_current_user.
+    
+    Entries are plain dicts ({"user": {...}, "expires_at": datetime}) so a shared
+    backend (e.g. Redis) can serialize them and several workers can share one cache.
+    Plug a custom backend in with set_session_cache().
+    """
+    
+    @abstractmethod
+    async def get(self, token: str) -> Optional[Dict[str, Any]]:
+        ...
+    
+    @abstractmethod
+    async def set(self, token: str, entry: Dict[str, Any]) -> None:
+        ...
+    
+    @abstractmethod
+    async def delete(self, token: str) -> None:
+        ...
+    
+    @abstractmethod
+    async def delete_user(self, user_id: str) -> None:
+        ...
+
+
+class NullSessionCache(SessionCacheBackend):
+    """Disables caching; every request goes to the database"""
+    
+    async def get(self, token: str) -> Optional[Dict[str, Any]]:
+        return None
+    
+    async def set(self, token: str, entry: Dict[str, Any]) -> None:
+        pass
+    
+    async def delete(self, token: str) -> None:
+        pass
+    
+    async def delete_user(self, user_id: str) -> None:
+        pass
+
+
+class MemorySessionCache(SessionCacheBackend):
+    """In-process LRU cache bounded by size, with a TTL capped at the session's expires_at"""
+    
+    def __init__(self, max_size: int, ttl_seconds: int):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # token -> (entry, cached_until)
+        self._user_tokens: Dict[str, Set[str]] = {}
+    
+    async def get(self, token: str) -> Optional[Dict[str, Any]]:
+        item = self._entries.get(token)
+        if item is None:
+            return None
+        entry, cached_until = item
+        if time.monotonic() >= cached_until or entry["expires_at"] <= datetime.utcnow():
+            self._remove(token)
+            return None
+        self._entries.move_to_end(token)
+        return entry
+    
+    async def set(self, token: str, entry: Dict[str, Any]) -> None:
+        remaining = (entry["expires_at"] - datetime.utcnow()).total_seconds()
+        if remaining <= 0:
+            return
+        self._remove(token)
+        self._entries[token] = (entry, time.monotonic() + min(self.ttl_seconds, remaining))
+        self._user_tokens.setdefault(entry["user"]["id"], set()).add(token)
+        while len(self._entries) > self.max_size:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+    
+    async def delete(self, token: str) -> None:
+        self._remove(token)
+    
+    async def delete_user(self, user_id: str) -> None:
+        for token in list(self._user_tokens.get(user_id, ())):
+            self._remove(token)
+    
+    def _remove(self, token: str) -> None:
+        item = self._entries.pop(token, None)
+        if item is None:
+            return
+        user_id = item[0]["user"]["id"]
+        tokens = self._user_tokens.get(user_id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._user_tokens[user_id]
+
+
+def _default_backend() -> SessionCacheBackend:
+    if not settings.session_cache_enabled:
+        return NullSessionCache()
+    return MemorySessionCache(
+        max_size=settings.session_cache_max_size,
+        ttl_seconds=settings.session_cache_ttl_seconds
+    )
+
+
+_session_cache: SessionCacheBackend = _default_backend()
+
+
+def get_session_cache() -> SessionCacheBackend:
+    """Get the active session cache backend"""
+    return _session_cache
+
+
+def set_session_cache(backend: SessionCacheBackend) -> None:
+    """Replace the session cache backend (e.g. with a shared one for multi-worker deployments)"""
+    global _session_cache
+    _session_cache = backend
@@ -1,18 +1,47 @@
 from fastapi import FastAPI, Request
-from fastapi.responses import Response
+from fastapi.responses import Response, PlainTextResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 from contextlib import asynccontextmanager
+import asyncio
 import os
+import time
 from core.config import settings
 from core.database import connect_to_mongo, close_mongo_connection
-from routes import auth, tasks, analytics, users
+from core.security import password_hash_stats
+from core import metrics
+from routes import auth, tasks, analytics, users, events
+from services.leaderboard_service import LeaderboardService
+from services.session_service import SessionService
+from services.analytics_log_writer import analytics_log_writer
+from services.result_cache import analytics_cache
+from services.events import event_broker
+from utils.backfill_task_type import run_on_startup as backfill_task_types
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     await connect_to_mongo()
+    await LeaderboardService.ensure_built()
+    backfill = None
+    if settings.task_type_backfill_on_startup:
+        backfill = asyncio.create_task(backfill_task_types())
+    sweeper = None
+    if settings.session_sweep_interval_seconds > 0:
+        sweeper = asyncio.create_task(
+            SessionService.run_sweeper(settings.session_sweep_interval_seconds)
+        )
+    if settings.analytics_log_async:
+        analytics_log_writer.start()
+    if settings.events_enabled:
+        await event_broker.start()
     yield
     # Shutdown
+    if sweeper:
+        sweeper.cancel()
+    if backfill:
+        backfill.cancel()
+    await event_broker.stop()
+    await analytics_log_writer.stop()
     await close_mongo_connection()
 
 
@@ -50,6 +79,7 @@ class CORSMiddleware(BaseHTTPMiddleware):
                 response.headers["Access-Control-Allow-Credentials"] = "true"
                 response.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, DELETE, PATCH, OPTIONS"
                 response.headers["Access-Control-Allow-Headers"] = "*"
+                response.headers["Access-Control-Expose-Headers"] = "X-Next-Cursor, ETag"
             return response
         
         # Process the request
@@ -61,16 +91,42 @@ class CORSMiddleware(BaseHTTPMiddleware):
             response.headers["Access-Control-Allow-Credentials"] = "true"
             response.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, DELETE, PATCH, OPTIONS"
             response.headers["Access-Control-Allow-Headers"] = "*"
+            response.headers["Access-Control-Expose-Headers"] = "X-Next-Cursor, ETag"
         
         return response
 
 app.add_middleware(CORSMiddleware)
 
+
+# Request timing - per-route latency plus the MongoDB commands each request issued
+class MetricsMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        stats, started = metrics.start_request()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            # Label by route template (not raw path) to keep the number of series bounded
+            route = request.scope.get("route")
+            metrics.registry.observe_request(
+                request.method,
+                route.path if route else "unmatched",
+                status,
+                time.perf_counter() - started,
+                stats
+            )
+
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(auth.router)
 app.include_router(tasks.router)
 app.include_router(analytics.router)
 app.include_router(users.router)
+app.include_router(events.router)
 
 
 @app.get("/")
@@ -80,5 +136,18 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "password_hashing": password_hash_stats(),
+        "analytics_log_writer": analytics_log_writer.stats(),
+        "analytics_cache": analytics_cache.stats(),
+        "events": event_broker.stats()
+    }
+
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    """Prometheus scrape endpoint"""
+    if not settings.metrics_enabled:
+        return Response(status_code=404)
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
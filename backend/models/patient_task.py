@@ -1,11 +1,19 @@
-from beanie import Document
+from beanie import Document, PydanticObjectId
 from typing import Optional, Literal, Dict, Any
 from datetime import datetime
-from pydantic import Field
+from pydantic import BaseModel, Field
+from pymongo import IndexModel, ASCENDING, DESCENDING
+
+
+def derive_task_type(title: Optional[str]) -> str:
+    """Task type is the first word of the title (e.g. "Cardiac" for "Cardiac Rehabilitation Assessment")"""
+    words = title.split() if title else []
+    return words[0] if words else "Other"
 
 
 class PatientTask(Document):
     title: str
+    task_type: Optional[str] = None  # derive_task_type(title); backfilled by utils.backfill_task_type
     description: str
     patient: dict  # PatientInfo as dict
     assigned_student_id: str
@@ -16,5 +24,24 @@ class PatientTask(Document):
     
     class Settings:
         name = "patient_tasks"
-        indexes = ["assigned_student_id", "status", "created_at"]
+        indexes = [
+            "assigned_student_id",
+            "status",
+            "created_at",
+            "task_type",
+            # Keyset pagination on (created_at, _id), optionally filtered by status or student
+            IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("assigned_student_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+        ]
+
 
+class PatientTaskSummary(BaseModel):
+    """Projection of PatientTask for list views (no description or patient details)"""
+    id: PydanticObjectId = Field(alias="_id")
+    title: str
+    assigned_student_id: str
+    status: Literal["pending", "accepted", "rejected", "completed"]
+    quality_score: Optional[float] = None
+    created_at: datetime
+    completed_at: Optional[datetime] = None
@@ -2,6 +2,7 @@ from beanie import Document
 from datetime import datetime, timedelta
 from typing import Optional
 from pydantic import Field
+from pymongo import IndexModel, ASCENDING, DESCENDING
 
 
 class Session(Document):
@@ -12,5 +13,10 @@ class Session(Document):
     
     class Settings:
         name = "sessions"
-        indexes = ["user_id", "token", "expires_at"]
-
+        indexes = [
+            "user_id",
+            "token",
+            # Mongo removes sessions as soon as expires_at passes
+            IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+            IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING)]),
+        ]
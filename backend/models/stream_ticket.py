@@ -0,0 +1,24 @@
+from beanie import Document
+from datetime import datetime
+from pydantic import Field
+from pymongo import IndexModel, ASCENDING
+
+
+class StreamTicket(Document):
+    """Short-lived, single-use credential for opening an event stream.
+    
+    EventSource cannot send headers, so the browser puts this ticket in the stream URL
+    instead of its session token; access logs only ever see a spent ticket.
+    """
+    ticket: str = Field(unique=True)
+    session_token: str  # re-validated while the stream is open
+    expires_at: datetime
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    
+    class Settings:
+        name = "stream_tickets"
+        indexes = [
+            IndexModel([("ticket", ASCENDING)], unique=True),
+            # Unused tickets are removed once they expire
+            IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+        ]
@@ -0,0 +1,27 @@
+from beanie import Document
+from datetime import datetime
+from pydantic import Field
+from pymongo import IndexModel, ASCENDING, DESCENDING
+
+
+class StudentStats(Document):
+    """Materialized per-student leaderboard row, kept up to date by TaskService"""
+    student_id: str
+    tasks_completed: int = 0  # completed tasks that have a quality score
+    total_score: float = 0
+    average_score: float = 0
+    total_responses: int = 0  # accepted + rejected + completed responses
+    accepted_responses: int = 0
+    acceptance_rate: float = 0
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    
+    class Settings:
+        name = "student_stats"
+        indexes = [
+            IndexModel([("student_id", ASCENDING)], unique=True),
+            IndexModel([
+                ("average_score", DESCENDING),
+                ("tasks_completed", DESCENDING),
+                ("student_id", ASCENDING)
+            ]),
+        ]
@@ -0,0 +1,21 @@
+from beanie import Document
+from datetime import datetime
+from typing import Optional
+from pydantic import Field
+from pymongo import IndexModel, ASCENDING
+
+
+class TaskEvent(Document):
+    """Fan-out record for the mongo events backend; every worker tails inserts via a change stream"""
+    type: str  # e.g., "task_created", "task_scored", "leaderboard_updated"
+    student_id: Optional[str] = None  # student the event concerns (admins receive every event)
+    broadcast: bool = False  # deliver to every student too
+    data: dict = Field(default_factory=dict)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    
+    class Settings:
+        name = "task_events"
+        indexes = [
+            # Events are only needed while workers tail them
+            IndexModel([("created_at", ASCENDING)], name="created_at_ttl", expireAfterSeconds=3600),
+        ]
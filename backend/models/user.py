@@ -1,6 +1,6 @@
-from beanie import Document
+from beanie import Document, PydanticObjectId
 from typing import Literal
-from pydantic import EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field
 
 
 class User(Document):
@@ -13,3 +13,8 @@ class User(Document):
         name = "users"
         indexes = ["email"]
 
+
+class UserName(BaseModel):
+    """Projection of User for name lookups (no email or password hash)"""
+    id: PydanticObjectId = Field(alias="_id")
+    name: str
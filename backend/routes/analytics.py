@@ -1,18 +1,32 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Request, Response
 from schemas.analytics import (
     StudentRankingSchema, StudentAnalyticsSchema, AdminAnalyticsSchema
 )
 from services.analytics_service import AnalyticsService
+from services.result_cache import analytics_cache, data_version
 from core.dependencies import get_current_admin, get_current_student
+from core.etag import not_modified_response, tag_response
 from models.user import User
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
 
 
 @router.get("/rankings", response_model=list[StudentRankingSchema])
-async def get_rankings(admin: User = Depends(get_current_admin)):
+async def get_rankings(
+    request: Request,
+    response: Response,
+    admin: User = Depends(get_current_admin)
+):
     """Get student rankings (admin only)"""
-    rankings = await AnalyticsService.get_student_rankings()
+    not_modified = not_modified_response(request, data_version.value)
+    if not_modified:
+        return not_modified
+    
+    # Tag with the version of the (possibly stale) cached result actually returned
+    rankings, version = await analytics_cache.get_or_compute(
+        ("rankings",), AnalyticsService.get_student_rankings
+    )
+    tag_response(request, response, version)
     return [
         StudentRankingSchema(**r) for r in rankings
     ]
@@ -21,29 +35,64 @@ async def get_rankings(admin: User = Depends(get_current_admin)):
 @router.get("/student/{student_id}", response_model=StudentAnalyticsSchema)
 async def get_student_analytics(
     student_id: str,
+    request: Request,
+    response: Response,
     admin: User = Depends(get_current_admin)
 ):
     """Get analytics for a specific student (admin only)"""
+    # Ranks move with every student's scores, so the global version applies
+    not_modified = not_modified_response(request, data_version.value)
+    if not_modified:
+        return not_modified
+    
     try:
-        analytics = await AnalyticsService.get_student_analytics(student_id)
+        analytics, version = await analytics_cache.get_or_compute(
+            ("student", student_id),
+            lambda: AnalyticsService.get_student_analytics(student_id)
+        )
+        tag_response(request, response, version)
         return StudentAnalyticsSchema(**analytics)
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
 
 
 @router.get("/student", response_model=StudentAnalyticsSchema)
-async def get_my_analytics(student: User = Depends(get_current_student)):
+async def get_my_analytics(
+    request: Request,
+    response: Response,
+    student: User = Depends(get_current_student)
+):
     """Get analytics for current student"""
+    student_id = str(student.id)
+    not_modified = not_modified_response(request, student_id, data_version.value)
+    if not_modified:
+        return not_modified
+    
     try:
-        analytics = await AnalyticsService.get_student_analytics(str(student.id))
+        analytics, version = await analytics_cache.get_or_compute(
+            ("student", student_id),
+            lambda: AnalyticsService.get_student_analytics(student_id)
+        )
+        tag_response(request, response, student_id, version)
         return StudentAnalyticsSchema(**analytics)
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
 
 
 @router.get("/admin", response_model=AdminAnalyticsSchema)
-async def get_admin_analytics(admin: User = Depends(get_current_admin)):
+async def get_admin_analytics(
+    request: Request,
+    response: Response,
+    admin: User = Depends(get_current_admin)
+):
     """Get comprehensive admin analytics"""
-    analytics = await AnalyticsService.get_admin_analytics()
+    not_modified = not_modified_response(request, data_version.value)
+    if not_modified:
+        return not_modified
+    
+    analytics, version = await analytics_cache.get_or_compute(
+        ("admin",), AnalyticsService.get_admin_analytics
+    )
+    tag_response(request, response, version)
     return AdminAnalyticsSchema(**analytics)
 
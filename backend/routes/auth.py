@@ -1,10 +1,9 @@
 from fastapi import APIRouter, HTTPException, status, Depends
 from schemas.auth import LoginRequest, TokenResponse
 from models.user import User
-from models.session import Session
-from core.security import verify_password, generate_session_token, get_session_expiry
-from core.dependencies import get_current_user
-from datetime import datetime
+from core.security import verify_password_async
+from core.dependencies import get_current_user, get_session_token
+from services.session_service import SessionService
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
@@ -22,26 +21,17 @@ async def login(credentials: LoginRequest):
             )
         
         # Verify password
-        if not verify_password(credentials.password, user.password_hash):
+        if not await verify_password_async(credentials.password, user.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect email or password"
             )
         
-        # Generate simple session token
-        token = generate_session_token()
-        expires_at = get_session_expiry()
-        
-        # Create session
-        session = Session(
-            user_id=str(user.id),
-            token=token,
-            expires_at=expires_at
-        )
-        await session.insert()
+        # Create session (evicts the user's oldest sessions beyond the cap)
+        session = await SessionService.create_session(str(user.id))
         
         return TokenResponse(
-            access_token=token,
+            access_token=session.token,
             user={
                 "id": str(user.id),
                 "name": user.name,
@@ -62,12 +52,15 @@ async def login(credentials: LoginRequest):
 
 
 @router.post("/logout")
-async def logout(current_user: User = Depends(get_current_user)):
-    """Logout and delete session"""
-    # Delete all sessions for this user
-    sessions = await Session.find(Session.user_id == str(current_user.id)).to_list()
-    for session in sessions:
-        await session.delete()
+async def logout(
+    others_only: bool = False,
+    current_user: User = Depends(get_current_user),
+    token: str = Depends(get_session_token)
+):
+    """Logout and delete sessions (all of them, or all but the current one)"""
+    revoked = await SessionService.revoke_user_sessions(
+        str(current_user.id),
+        keep_token=token if others_only else None
+    )
     
-    return {"message": "Logged out successfully"}
-
+    return {"message": "Logged out successfully", "revoked": revoked}
@@ -0,0 +1,95 @@
+import asyncio
+import json
+from typing import Any, Dict, Optional
+from fastapi import APIRouter, HTTPException, status, Depends, Header, Query, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from core.config import settings
+from core.dependencies import get_current_user, get_session_token
+from models.user import User
+from services.events import event_broker
+from services.session_service import SessionService
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+
+def _format_event(event_type: str, data: Dict[str, Any]) -> str:
+    # Same encoding as the REST responses (ISO 8601 datetimes), since clients merge both
+    return f"event: {event_type}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+
+@router.post("/ticket")
+async def create_stream_ticket(
+    current_user: User = Depends(get_current_user),
+    token: str = Depends(get_session_token)
+):
+    """Issue a single-use ticket for GET /events/stream (valid for events_ticket_ttl_seconds)"""
+    ticket = await SessionService.create_stream_ticket(token)
+    return {"ticket": ticket.ticket, "expires_in": settings.events_ticket_ttl_seconds}
+
+
+@router.get("/stream")
+async def stream_events(
+    request: Request,
+    ticket: Optional[str] = Query(None, description="Single-use ticket from POST /events/ticket"),
+    authorization: Optional[str] = Header(None)
+):
+    """Server-Sent Events: task and leaderboard changes visible to the current user.
+    
+    Browsers authenticate with a ticket (EventSource cannot send headers), so the session
+    token never appears in a URL; other clients may send a Bearer header instead.
+    Admins receive every event, students only their own tasks' events plus broadcasts.
+    Clients should refetch their lists on 'ready' (after every (re)connect) and 'resync'.
+    """
+    token = None
+    if authorization and authorization.startswith("Bearer "):
+        token = authorization.replace("Bearer ", "")
+    elif ticket:
+        token = await SessionService.redeem_stream_ticket(ticket)
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Missing or expired stream ticket",
+        )
+    user = await get_current_user(token)
+    subscription = event_broker.subscribe(str(user.id), user.role, token)
+    
+    async def stream():
+        loop = asyncio.get_running_loop()
+        next_session_check = loop.time() + settings.events_session_check_seconds
+        try:
+            yield _format_event("ready", {"role": user.role})
+            while True:
+                # Re-check the session on a fixed interval, however busy the stream is, so
+                # revoked or expired sessions on any worker stop receiving events
+                if loop.time() >= next_session_check:
+                    try:
+                        await get_current_user(token)
+                    except HTTPException:
+                        yield _format_event("unauthorized", {})
+                        break
+                    next_session_check = loop.time() + settings.events_session_check_seconds
+                
+                try:
+                    event = await asyncio.wait_for(
+                        subscription.queue.get(),
+                        min(settings.events_heartbeat_seconds, max(next_session_check - loop.time(), 0))
+                    )
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": ping\n\n"
+                    continue
+                if event["type"] == "unauthorized":
+                    # Revoked on this worker (SessionService.revoke_user_sessions)
+                    yield _format_event("unauthorized", {})
+                    break
+                yield _format_event(event["type"], {"student_id": event.get("student_id"), **event["data"]})
+        finally:
+            event_broker.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
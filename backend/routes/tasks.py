@@ -1,11 +1,16 @@
-from fastapi import APIRouter, HTTPException, status, Depends
-from typing import List
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Request, Response
+from typing import List, Optional, Literal, Union
+from datetime import datetime
 from schemas.task import (
-    TaskCreateSchema, TaskResponseSchema, TaskAcceptSchema,
-    TaskRejectSchema, TaskScoreSchema
+    TaskCreateSchema, TaskResponseSchema, TaskSummarySchema, TaskAcceptSchema,
+    TaskRejectSchema, TaskScoreSchema, TaskBulkCreateSchema, TaskBulkResultSchema,
+    TaskBulkScoreSchema, TaskBulkScoreResultSchema
 )
 from services.task_service import TaskService
-from core.dependencies import get_current_admin, get_current_student
+from services.user_service import UserService
+from services.result_cache import data_version
+from core.dependencies import get_current_admin, get_current_student, get_current_user
+from core.etag import conditional_response, not_modified_response, tag_response
 from models.user import User
 from models.patient_task import PatientTask
 
@@ -20,14 +25,7 @@ async def create_task(
     """Create a new patient-linked task (admin only)"""
     try:
         task = await TaskService.create_task(task_data, str(admin.id))
-        # Get student name
-        student_name = None
-        try:
-            student = await User.get(task.assigned_student_id)
-            if student:
-                student_name = student.name
-        except:
-            pass
+        student_name = await UserService.resolve_name(task.assigned_student_id)
         
         return {
             "id": str(task.id),
@@ -45,43 +43,102 @@ async def create_task(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
+@router.post("/bulk", status_code=status.HTTP_201_CREATED, response_model=TaskBulkResultSchema)
+async def create_tasks_bulk(
+    bulk_data: TaskBulkCreateSchema,
+    admin: User = Depends(get_current_admin)
+):
+    """Create many tasks in one request (admin only); results are reported per item"""
+    results = await TaskService.create_tasks_bulk(bulk_data.tasks, str(admin.id))
+    created = sum(1 for r in results if r["id"])
+    return TaskBulkResultSchema(
+        created=created,
+        failed=len(results) - created,
+        results=results
+    )
+
+
+@router.post("/score/bulk", response_model=TaskBulkScoreResultSchema)
+async def score_tasks_bulk(
+    bulk_data: TaskBulkScoreSchema,
+    admin: User = Depends(get_current_admin)
+):
+    """Score many completed tasks in one request (admin only); results are reported per item"""
+    results = await TaskService.score_tasks_bulk(bulk_data.scores, str(admin.id))
+    failed = sum(1 for r in results if r["error"])
+    return TaskBulkScoreResultSchema(
+        scored=len(results) - failed,
+        failed=failed,
+        results=results
+    )
+
+
 @router.get("/admin")
-async def get_admin_tasks(admin: User = Depends(get_current_admin)):
-    """Get all tasks (admin view) - Simplified for presentation"""
+async def get_admin_tasks(
+    request: Request,
+    response: Response,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    status_filter: Optional[Literal["pending", "accepted", "rejected", "completed"]] = Query(None, alias="status"),
+    student_id: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    view: Literal["full", "summary"] = "full",
+    admin: User = Depends(get_current_admin)
+):
+    """Get a page of tasks (admin view), newest first; the next page cursor is in X-Next-Cursor"""
+    version = data_version.value
+    not_modified = not_modified_response(request, version)
+    if not_modified:
+        return not_modified
+    
     try:
-        tasks = await TaskService.get_admin_tasks()
+        tasks, next_cursor = await TaskService.get_admin_tasks(
+            limit=limit,
+            cursor=cursor,
+            status=status_filter,
+            student_id=student_id,
+            created_from=created_from,
+            created_to=created_to,
+            summary=view == "summary"
+        )
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
         
-        # Get student names for enrichment
-        student_ids = list(set(t.assigned_student_id for t in tasks if t.assigned_student_id))
+        # Get student names for enrichment (only the students on this page)
         student_map = {}
-        if student_ids:
-            try:
-                all_students = await User.find(User.role == "student").to_list()
-                student_map = {str(s.id): s.name for s in all_students}
-            except Exception as e:
-                print(f"Error fetching students: {e}")
+        try:
+            student_map = await UserService.resolve_names(t.assigned_student_id for t in tasks)
+        except Exception as e:
+            print(f"Error fetching students: {e}")
         
         # Return as plain dicts (no schema validation for presentation)
         result = []
         for task in tasks:
             try:
-                result.append({
+                item = {
                     "id": str(task.id),
                     "title": task.title,
-                    "description": task.description,
-                    "patient": task.patient if isinstance(task.patient, dict) else dict(task.patient),
                     "assigned_student_id": task.assigned_student_id,
                     "assigned_student_name": student_map.get(task.assigned_student_id),
                     "status": task.status,
                     "quality_score": task.quality_score,
                     "created_at": task.created_at.isoformat() if task.created_at else None,
                     "completed_at": task.completed_at.isoformat() if task.completed_at else None
-                })
+                }
+                if view == "full":
+                    item["description"] = task.description
+                    item["patient"] = task.patient if isinstance(task.patient, dict) else dict(task.patient)
+                result.append(item)
             except Exception as task_err:
                 print(f"Error processing task {task.id}: {task_err}")
                 continue
         
+        # Tagged only on success, so the empty fallback below is never cached by clients
+        tag_response(request, response, version)
         return result
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except HTTPException:
         raise
     except Exception as e:
@@ -93,10 +150,35 @@ async def get_admin_tasks(admin: User = Depends(get_current_admin)):
         return []
 
 
-@router.get("/student", response_model=List[TaskResponseSchema])
-async def get_student_tasks(student: User = Depends(get_current_student)):
-    """Get tasks assigned to current student"""
-    tasks = await TaskService.get_student_tasks(str(student.id))
+@router.get("/student", response_model=List[Union[TaskResponseSchema, TaskSummarySchema]])
+async def get_student_tasks(
+    request: Request,
+    response: Response,
+    view: Literal["full", "summary"] = "full",
+    student: User = Depends(get_current_student)
+):
+    """Get tasks assigned to current student (view=summary omits description and patient)"""
+    student_id = str(student.id)
+    not_modified = conditional_response(request, response, student_id, data_version.for_student(student_id))
+    if not_modified:
+        return not_modified
+    
+    if view == "summary":
+        tasks = await TaskService.get_student_tasks(student_id, summary=True)
+        return [
+            TaskSummarySchema(
+                id=str(task.id),
+                title=task.title,
+                assigned_student_id=task.assigned_student_id,
+                status=task.status,
+                quality_score=task.quality_score,
+                created_at=task.created_at,
+                completed_at=task.completed_at
+            )
+            for task in tasks
+        ]
+    
+    tasks = await TaskService.get_student_tasks(student_id)
     return [
         TaskResponseSchema(
             id=str(task.id),
@@ -113,6 +195,34 @@ async def get_student_tasks(student: User = Depends(get_current_student)):
     ]
 
 
+@router.get("/{task_id}", response_model=TaskResponseSchema)
+async def get_task(
+    task_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Get full task details (admin, or the assigned student)"""
+    try:
+        task = await TaskService.get_task(task_id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    
+    if current_user.role != "admin" and task.assigned_student_id != str(current_user.id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
+    
+    return TaskResponseSchema(
+        id=str(task.id),
+        title=task.title,
+        description=task.description,
+        patient=task.patient,
+        assigned_student_id=task.assigned_student_id,
+        assigned_student_name=await UserService.resolve_name(task.assigned_student_id),
+        status=task.status,
+        quality_score=task.quality_score,
+        created_at=task.created_at,
+        completed_at=task.completed_at
+    )
+
+
 @router.post("/{task_id}/accept", response_model=TaskResponseSchema)
 async def accept_task(
     task_id: str,
@@ -198,7 +308,7 @@ async def score_task(
             description=task.description,
             patient=task.patient,
             assigned_student_id=task.assigned_student_id,
-            assigned_student_name=getattr(task, "assigned_student_name", None),
+            assigned_student_name=await UserService.resolve_name(task.assigned_student_id),
             status=task.status,
             quality_score=task.quality_score,
             created_at=task.created_at,
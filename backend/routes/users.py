@@ -1,15 +1,26 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from typing import List
 from schemas.user import UserResponseSchema
 from models.user import User
 from core.dependencies import get_current_admin
+from core.etag import conditional_response
+from services.session_service import SessionService
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 
 @router.get("/students", response_model=List[UserResponseSchema])
-async def get_students(admin: User = Depends(get_current_admin)):
+async def get_students(
+    request: Request,
+    response: Response,
+    admin: User = Depends(get_current_admin)
+):
     """Get all students (admin only)"""
+    # Students are only added by the seed scripts, so the ETag window alone bounds staleness
+    not_modified = conditional_response(request, response)
+    if not_modified:
+        return not_modified
+    
     students = await User.find(User.role == "student").to_list()
     return [
         UserResponseSchema(
@@ -21,3 +32,9 @@ async def get_students(admin: User = Depends(get_current_admin)):
         for s in students
     ]
 
+
+@router.delete("/{user_id}/sessions")
+async def revoke_user_sessions(user_id: str, admin: User = Depends(get_current_admin)):
+    """Revoke every active session of a user (admin only)"""
+    revoked = await SessionService.revoke_user_sessions(user_id)
+    return {"message": "Sessions revoked", "revoked": revoked}
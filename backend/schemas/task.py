@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, Literal
+from typing import Optional, Literal, List
 from datetime import datetime
 
 
@@ -17,6 +17,22 @@ class TaskCreateSchema(BaseModel):
     assigned_student_id: str
 
 
+class TaskBulkCreateSchema(BaseModel):
+    tasks: List[TaskCreateSchema] = Field(min_length=1, max_length=5000)
+
+
+class TaskBulkItemResultSchema(BaseModel):
+    index: int
+    id: Optional[str] = None
+    error: Optional[str] = None
+
+
+class TaskBulkResultSchema(BaseModel):
+    created: int
+    failed: int
+    results: List[TaskBulkItemResultSchema]
+
+
 class TaskUpdateSchema(BaseModel):
     status: Optional[Literal["pending", "accepted", "rejected", "completed"]] = None
     quality_score: Optional[float] = Field(None, ge=0, le=5)
@@ -38,6 +54,20 @@ class TaskResponseSchema(BaseModel):
         from_attributes = True
 
 
+class TaskSummarySchema(BaseModel):
+    id: str
+    title: str
+    assigned_student_id: str
+    assigned_student_name: Optional[str] = None
+    status: Literal["pending", "accepted", "rejected", "completed"]
+    quality_score: Optional[float] = None
+    created_at: datetime
+    completed_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
 class TaskAcceptSchema(BaseModel):
     pass
 
@@ -49,3 +79,17 @@ class TaskRejectSchema(BaseModel):
 class TaskScoreSchema(BaseModel):
     quality_score: float = Field(ge=0, le=5)
 
+
+class TaskScoreItemSchema(BaseModel):
+    task_id: str
+    quality_score: float = Field(ge=0, le=5)
+
+
+class TaskBulkScoreSchema(BaseModel):
+    scores: List[TaskScoreItemSchema] = Field(min_length=1, max_length=5000)
+
+
+class TaskBulkScoreResultSchema(BaseModel):
+    scored: int
+    failed: int
+    results: List[TaskBulkItemResultSchema]
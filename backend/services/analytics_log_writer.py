@@ -0,0 +1,114 @@
+import asyncio
+from typing import List, Optional
+from models.analytics_log import AnalyticsLog
+from core.config import settings
+
+
+class AnalyticsLogWriter:
+    """Buffers AnalyticsLog entries in a bounded queue and writes them with insert_many.
+    
+    A batch is flushed when it reaches analytics_log_batch_size entries or when
+    analytics_log_flush_interval_seconds has passed since its first entry. When the
+    queue is full new entries are dropped and counted rather than slowing requests.
+    """
+    
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._stats = {
+            "enqueued": 0,
+            "written": 0,
+            "dropped": 0,
+            "failed": 0,
+            "batches": 0,
+            "max_queue_depth": 0
+        }
+    
+    @property
+    def running(self) -> bool:
+        return self._worker is not None
+    
+    async def write(self, log: AnalyticsLog) -> None:
+        """Persist a log entry; returns immediately when the background queue is running"""
+        if self.running:
+            self.enqueue(log)
+            return
+        await log.insert()
+    
+    async def write_many(self, logs: List[AnalyticsLog]) -> None:
+        """Persist entries for writes that are already committed; failures are logged, not raised"""
+        if self.running:
+            for log in logs:
+                self.enqueue(log)
+            return
+        try:
+            await AnalyticsLog.insert_many(logs)
+        except Exception as e:
+            self._stats["failed"] += len(logs)
+            print(f"Analytics log write error: {e}")
+    
+    def enqueue(self, log: AnalyticsLog) -> bool:
+        """Queue a log entry without waiting; returns False if it was dropped"""
+        try:
+            self._queue.put_nowait(log)
+        except asyncio.QueueFull:
+            self._stats["dropped"] += 1
+            if self._stats["dropped"] % 100 == 1:
+                print(f"⚠️  Analytics log queue full, entries dropped so far: {self._stats['dropped']}")
+            return False
+        self._stats["enqueued"] += 1
+        self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], self._queue.qsize())
+        return True
+    
+    def start(self) -> None:
+        """Start the background writer (call from the app lifespan)"""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=settings.analytics_log_queue_size)
+        self._worker = asyncio.create_task(self._drain())
+    
+    async def stop(self) -> None:
+        """Flush everything still queued, then stop the background writer"""
+        if not self.running:
+            return
+        await self._queue.join()
+        self._worker.cancel()
+        self._worker = None
+    
+    def stats(self) -> dict:
+        """Counters for monitoring backpressure and drops"""
+        return {
+            "running": self.running,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            **self._stats
+        }
+    
+    async def _drain(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + settings.analytics_log_flush_interval_seconds
+            while len(batch) < settings.analytics_log_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await self._flush(batch)
+    
+    async def _flush(self, batch: List[AnalyticsLog]) -> None:
+        try:
+            await AnalyticsLog.insert_many(batch)
+            self._stats["written"] += len(batch)
+            self._stats["batches"] += 1
+        except Exception as e:
+            self._stats["failed"] += len(batch)
+            print(f"Analytics log write error: {e}")
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+
+analytics_log_writer = AnalyticsLogWriter()
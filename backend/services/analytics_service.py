@@ -1,207 +1,193 @@
-from typing import Dict, List, Any
+import asyncio
+from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
 from models.patient_task import PatientTask
-from models.task_response import TaskResponse
 from models.user import User
-from beanie.odm.operators.find.comparison import In
+from services.leaderboard_service import LeaderboardService
+from services.user_service import UserService
+
+WEEK_MS = 7 * 24 * 60 * 60 * 1000
 
 
 class AnalyticsService:
     
     @staticmethod
-    async def get_student_rankings() -> List[Dict[str, Any]]:
+    async def get_student_rankings(limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """Get student rankings based on tasks completed, avg score, and acceptance rate"""
-        # First get completed tasks grouped by student
-        pipeline = [
-            {
-                "$match": {
-                    "status": "completed",
-                    "quality_score": {"$ne": None}
-                }
-            },
-            {
-                "$group": {
-                    "_id": "$assigned_student_id",
-                    "tasks_completed": {"$sum": 1},
-                    "average_score": {"$avg": "$quality_score"},
-                    "total_score": {"$sum": "$quality_score"}
-                }
-            }
-        ]
-        
-        task_groups = await PatientTask.aggregate(pipeline).to_list()
-        
-        # Get all student IDs and fetch students
-        from bson import ObjectId
-        student_ids = []
-        for item in task_groups:
-            student_id = item["_id"]
-            # Convert string to ObjectId if needed
-            try:
-                if isinstance(student_id, str):
-                    student_ids.append(ObjectId(student_id))
-                else:
-                    student_ids.append(student_id)
-            except:
-                student_ids.append(student_id)
-        
-        students = await User.find({"_id": {"$in": student_ids}}).to_list()
-        student_map = {str(s.id): s for s in students}
+        # Rows come pre-aggregated and pre-sorted from the materialized leaderboard
+        stats = await LeaderboardService.get_ranked_stats(limit)
         
-        # Build rankings with student names
-        completed_tasks = []
-        for item in task_groups:
-            student_id = item["_id"]
-            student = student_map.get(student_id)
-            if student:
-                completed_tasks.append({
-                    "student_id": student_id,
-                    "student_name": student.name,
-                    "tasks_completed": item["tasks_completed"],
-                    "average_score": round(item["average_score"], 2)
-                })
+        # Fetch names for the ranked students only
+        student_names = await UserService.resolve_names(row.student_id for row in stats)
         
-        # Get acceptance rates
-        acceptance_pipeline = [
-            {
-                "$group": {
-                    "_id": "$student_id",
-                    "total_responses": {"$sum": 1},
-                    "accepted": {
-                        "$sum": {"$cond": [{"$eq": ["$action", "accepted"]}, 1, 0]}
-                    }
-                }
-            }
-        ]
-        
-        acceptance_data = await TaskResponse.aggregate(acceptance_pipeline).to_list()
-        acceptance_map = {
-            item["_id"]: (item["accepted"] / item["total_responses"] * 100) 
-            if item["total_responses"] > 0 else 0
-            for item in acceptance_data
-        }
-        
-        # Combine data
         rankings = []
-        for task_data in completed_tasks:
-            student_id = task_data["student_id"]
+        for row in stats:
+            student_name = student_names.get(row.student_id)
+            if not student_name:
+                continue
             rankings.append({
-                "student_id": student_id,
-                "student_name": task_data["student_name"],
-                "tasks_completed": task_data["tasks_completed"],
-                "average_score": task_data["average_score"],
-                "acceptance_rate": round(acceptance_map.get(student_id, 0), 2)
+                "student_id": row.student_id,
+                "student_name": student_name,
+                "tasks_completed": row.tasks_completed,
+                "average_score": round(row.average_score, 2),
+                "acceptance_rate": round(row.acceptance_rate, 2),
+                "rank": len(rankings) + 1
             })
         
-        # Sort by average score descending, then by tasks completed
-        rankings.sort(key=lambda x: (x["average_score"], x["tasks_completed"]), reverse=True)
-        
-        # Add rank
-        for idx, ranking in enumerate(rankings, 1):
-            ranking["rank"] = idx
-        
         return rankings
     
     @staticmethod
     async def get_student_analytics(student_id: str) -> Dict[str, Any]:
         """Get comprehensive analytics for a specific student"""
-        # Get student info
-        student = await User.get(student_id)
-        if not student:
+        now = datetime.utcnow()
+        # Last 6 calendar weeks (Monday 00:00 UTC), the current one included
+        current_week = (now - timedelta(days=now.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
+        first_week = current_week - timedelta(weeks=5)
+        scored = {"status": "completed", "quality_score": {"$ne": None}}
+        
+        # Every per-task figure in one pass; only small scalar rows come back
+        student_pipeline = [
+            {
+                "$match": {
+                    "assigned_student_id": student_id,
+                    "status": {"$in": ["pending", "accepted", "completed"]}
+                }
+            },
+            {
+                "$project": {
+                    "title": 1,
+                    "task_type": 1,
+                    "status": 1,
+                    "quality_score": 1,
+                    "created_at": 1,
+                    "completed_at": 1,
+                    "patient_age": "$patient.age"
+                }
+            },
+            {
+                "$facet": {
+                    "overall": [
+                        {"$match": scored},
+                        {"$group": {"_id": None, "avg_score": {"$avg": "$quality_score"}}}
+                    ],
+                    "history": [
+                        {"$match": scored},
+                        {"$addFields": {"done_at": {"$ifNull": ["$completed_at", "$created_at"]}}},
+                        {"$sort": {"done_at": -1}},
+                        {"$limit": 7},
+                        {
+                            "$project": {
+                                "_id": 0,
+                                "date": {"$dateToString": {"format": "%Y-%m-%d", "date": "$done_at"}},
+                                "task": "$title",
+                                "score": "$quality_score"
+                            }
+                        }
+                    ],
+                    "weeks": [
+                        {
+                            "$match": {
+                                **scored,
+                                "completed_at": {"$gte": first_week, "$lt": current_week + timedelta(weeks=1)}
+                            }
+                        },
+                        {
+                            "$group": {
+                                "_id": {
+                                    "$floor": {
+                                        "$divide": [
+                                            {"$subtract": ["$completed_at", first_week]},
+                                            WEEK_MS
+                                        ]
+                                    }
+                                },
+                                "score": {"$avg": "$quality_score"},
+                                "tasks": {"$sum": 1}
+                            }
+                        },
+                        {"$sort": {"_id": 1}}
+                    ],
+                    "types": [
+                        {"$match": scored},
+                        {
+                            "$group": {
+                                "_id": {"$ifNull": ["$task_type", "Other"]},
+                                "avg_score": {"$avg": "$quality_score"},
+                                "completed": {"$sum": 1}
+                            }
+                        },
+                        {"$sort": {"completed": -1, "_id": 1}}
+                    ],
+                    "upcoming": [
+                        {"$match": {"status": {"$in": ["pending", "accepted"]}}},
+                        {"$sort": {"created_at": -1}},
+                        {"$limit": 3},
+                        {"$project": {"title": 1, "created_at": 1, "patient_age": 1}}
+                    ]
+                }
+            }
+        ]
+        
+        # Independent queries run concurrently
+        student_name, facet_result, standing = await asyncio.gather(
+            UserService.resolve_name(student_id),
+            PatientTask.aggregate(student_pipeline).to_list(),
+            LeaderboardService.get_student_rank(student_id)
+        )
+        if not student_name:
             raise ValueError("Student not found")
+        facets = facet_result[0] if facet_result else {}
         
-        # Get all completed tasks for this student
-        completed_tasks = await PatientTask.find(
-            PatientTask.assigned_student_id == student_id,
-            PatientTask.status == "completed",
-            PatientTask.quality_score != None
-        ).to_list()
+        # Performance history (last 7 tasks), oldest first
+        performance_history = list(reversed(facets.get("history", [])))
         
-        # Performance history (last 7 tasks)
-        recent_tasks = sorted(completed_tasks, key=lambda x: x.completed_at or x.created_at, reverse=True)[:7]
-        performance_history = [
+        # Weekly progress (last 6 weeks), non-empty weeks only
+        weekly_progress = [
             {
-                "date": (task.completed_at or task.created_at).strftime("%Y-%m-%d"),
-                "task": task.title,
-                "score": task.quality_score or 0
+                "week": f"Week {int(bucket['_id']) + 1}",
+                "score": round(bucket["score"], 1),
+                "tasks": bucket["tasks"],
+                "improvement": 0.2  # Simplified for now
             }
-            for task in reversed(recent_tasks)
+            for bucket in facets.get("weeks", [])
         ]
         
-        # Weekly progress (last 6 weeks)
-        weekly_progress = []
-        for i in range(6, 0, -1):
-            week_start = datetime.utcnow() - timedelta(weeks=i)
-            week_end = week_start + timedelta(weeks=1)
-            
-            week_tasks = [
-                t for t in completed_tasks
-                if t.completed_at and week_start <= t.completed_at < week_end
-            ]
-            
-            if week_tasks:
-                avg_score = sum(t.quality_score or 0 for t in week_tasks) / len(week_tasks)
-                weekly_progress.append({
-                    "week": f"Week {7-i}",
-                    "score": round(avg_score, 1),
-                    "tasks": len(week_tasks),
-                    "improvement": 0.2  # Simplified for now
-                })
-        
         # Task type performance
-        task_types = {}
-        for task in completed_tasks:
-            task_type = task.title.split()[0] if task.title else "Other"
-            if task_type not in task_types:
-                task_types[task_type] = {"scores": [], "count": 0}
-            task_types[task_type]["scores"].append(task.quality_score or 0)
-            task_types[task_type]["count"] += 1
-        
-        task_type_performance = []
         colors = ["#3B82F6", "#10B981", "#F59E0B", "#8B5CF6", "#EF4444"]
-        for idx, (task_type, data) in enumerate(task_types.items()):
-            avg_score = sum(data["scores"]) / len(data["scores"])
-            task_type_performance.append({
-                "type": task_type,
-                "avg_score": round(avg_score, 1),
-                "completed": data["count"],
+        task_type_performance = [
+            {
+                "type": row["_id"] or "Other",
+                "avg_score": round(row["avg_score"], 1),
+                "completed": row["completed"],
                 "color": colors[idx % len(colors)]
-            })
+            }
+            for idx, row in enumerate(facets.get("types", []))
+        ]
         
         # Upcoming tasks (pending or accepted)
-        upcoming_tasks = await PatientTask.find(
-            PatientTask.assigned_student_id == student_id,
-            In(PatientTask.status, ["pending", "accepted"])
-        ).sort(-PatientTask.created_at).limit(3).to_list()
-        
         upcoming = [
             {
-                "id": str(task.id),
-                "title": task.title,
-                "due": (task.created_at + timedelta(days=7)).strftime("%Y-%m-%d"),
-                "priority": "high" if task.patient.get("age", 0) > 70 else "medium",
+                "id": str(task["_id"]),
+                "title": task["title"],
+                "due": (task["created_at"] + timedelta(days=7)).strftime("%Y-%m-%d"),
+                "priority": "high" if (task.get("patient_age") or 0) > 70 else "medium",
                 "est": "2 h"
             }
-            for task in upcoming_tasks
+            for task in facets.get("upcoming", [])
         ]
         
-        # Calculate average score and rank
-        avg_score = sum(t.quality_score or 0 for t in completed_tasks) / len(completed_tasks) if completed_tasks else 0
-        
-        # Get rank
-        rankings = await AnalyticsService.get_student_rankings()
-        rank = next((r["rank"] for r in rankings if r["student_id"] == student_id), len(rankings) + 1)
+        overall = facets.get("overall") or [{"avg_score": 0}]
         
         return {
             "student_info": {
-                "name": student.name,
-                "id": str(student.id),
+                "name": student_name,
+                "id": student_id,
                 "specialization": "Emergency Medicine",  # Could be added to User model
                 "semester": "3rd Semester",  # Could be added to User model
-                "avgScore": round(avg_score, 1),
-                "rank": rank,
-                "totalStudents": len(rankings) + 1,
-                "percentile": round((1 - (rank - 1) / (len(rankings) + 1)) * 100, 0) if rankings else 0
+                "avgScore": round(overall[0]["avg_score"] or 0, 1),
+                "rank": standing["rank"],
+                "totalStudents": standing["total"],
+                "percentile": standing["percentile"]
             },
             "performance_history": performance_history,
             "weekly_progress": weekly_progress,
@@ -210,42 +196,131 @@ class AnalyticsService:
         }
     
     @staticmethod
-    async def get_admin_analytics() -> Dict[str, Any]:
-        """Get comprehensive analytics for admin dashboard"""
-        # Total students
-        total_students = await User.find(User.role == "student").count()
+    def _shift_month(month_start: datetime, months: int) -> datetime:
+        """First day of the calendar month `months` away from month_start"""
+        index = month_start.year * 12 + (month_start.month - 1) + months
+        return month_start.replace(year=index // 12, month=index % 12 + 1)
+    
+    @staticmethod
+    async def _get_monthly_trends() -> List[Dict[str, Any]]:
+        """Monthly trends for the 8 full calendar months before the current one"""
+        current_month = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        months = [AnalyticsService._shift_month(current_month, -i) for i in range(8, 0, -1)]
         
-        # Average score across all completed tasks
-        avg_score_pipeline = [
+        # Bucket by calendar month on the server; only 8 small rows come back
+        monthly_pipeline = [
             {
                 "$match": {
-                    "status": "completed",
-                    "quality_score": {"$ne": None}
+                    "created_at": {"$gte": months[0], "$lt": current_month}
                 }
             },
             {
                 "$group": {
-                    "_id": None,
-                    "avg_score": {"$avg": "$quality_score"}
+                    "_id": {"year": {"$year": "$created_at"}, "month": {"$month": "$created_at"}},
+                    "total": {"$sum": 1},
+                    "completed": {
+                        "$sum": {"$cond": [{"$eq": ["$status", "completed"]}, 1, 0]}
+                    },
+                    "completed_score": {
+                        "$sum": {
+                            "$cond": [
+                                {"$eq": ["$status", "completed"]},
+                                {"$ifNull": ["$quality_score", 0]},
+                                0
+                            ]
+                        }
+                    }
                 }
             }
         ]
-        avg_result = await PatientTask.aggregate(avg_score_pipeline).to_list()
-        average_score = round(avg_result[0]["avg_score"], 1) if avg_result else 0.0
+        buckets = await PatientTask.aggregate(monthly_pipeline).to_list()
+        bucket_map = {(b["_id"]["year"], b["_id"]["month"]): b for b in buckets}
         
-        # Tasks this month
+        monthly_trends = []
+        for month_start in months:
+            bucket = bucket_map.get((month_start.year, month_start.month))
+            total = bucket["total"] if bucket else 0
+            completed = bucket["completed"] if bucket else 0
+            avg_score_month = bucket["completed_score"] / completed if completed else 0
+            
+            monthly_trends.append({
+                "month": month_start.strftime("%b"),
+                "averageScore": round(avg_score_month, 1),
+                "completionRate": round((completed / total * 100) if total else 0, 0),
+                "totalTasks": total
+            })
+        return monthly_trends
+    
+    @staticmethod
+    async def get_admin_analytics() -> Dict[str, Any]:
+        """Get comprehensive analytics for admin dashboard"""
         month_start = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        tasks_this_month = await PatientTask.find(
-            PatientTask.created_at >= month_start
-        ).count()
         
-        # Completion rate
-        total_tasks = await PatientTask.find().count()
-        completed_tasks = await PatientTask.find(PatientTask.status == "completed").count()
+        # All task-level aggregates in a single pass over patient_tasks
+        dashboard_pipeline = [
+            {
+                "$facet": {
+                    "totals": [
+                        {
+                            "$group": {
+                                "_id": None,
+                                "total": {"$sum": 1},
+                                "completed": {
+                                    "$sum": {"$cond": [{"$eq": ["$status", "completed"]}, 1, 0]}
+                                },
+                                "this_month": {
+                                    "$sum": {"$cond": [{"$gte": ["$created_at", month_start]}, 1, 0]}
+                                }
+                            }
+                        }
+                    ],
+                    "average_score": [
+                        {
+                            "$match": {
+                                "status": "completed",
+                                "quality_score": {"$ne": None}
+                            }
+                        },
+                        {
+                            "$group": {
+                                "_id": None,
+                                "avg_score": {"$avg": "$quality_score"}
+                            }
+                        }
+                    ],
+                    "distribution": [
+                        {
+                            "$group": {
+                                "_id": {"$ifNull": ["$task_type", "Other"]},
+                                "count": {"$sum": 1}
+                            }
+                        },
+                        {"$sort": {"count": -1}},
+                        {"$limit": 5}
+                    ]
+                }
+            }
+        ]
+        
+        # Independent queries run concurrently
+        facet_result, total_students, rankings, monthly_trends = await asyncio.gather(
+            PatientTask.aggregate(dashboard_pipeline).to_list(),
+            User.find(User.role == "student").count(),
+            AnalyticsService.get_student_rankings(limit=8),
+            AnalyticsService._get_monthly_trends()
+        )
+        facets = facet_result[0] if facet_result else {}
+        
+        totals = facets.get("totals") or [{"total": 0, "completed": 0, "this_month": 0}]
+        total_tasks = totals[0]["total"]
+        completed_tasks = totals[0]["completed"]
+        tasks_this_month = totals[0]["this_month"]
         completion_rate = round((completed_tasks / total_tasks * 100), 0) if total_tasks > 0 else 0
         
+        avg_result = facets.get("average_score")
+        average_score = round(avg_result[0]["avg_score"], 1) if avg_result else 0.0
+        
         # Student performance data
-        rankings = await AnalyticsService.get_student_rankings()
         student_performance = [
             {
                 "name": r["student_name"],
@@ -257,60 +332,15 @@ class AnalyticsService:
             for r in rankings[:8]
         ]
         
-        # Monthly trends (last 8 months)
-        monthly_trends = []
-        for i in range(8, 0, -1):
-            month_start = (datetime.utcnow() - timedelta(days=30*i)).replace(day=1)
-            month_end = (month_start + timedelta(days=32)).replace(day=1)
-            
-            month_tasks = await PatientTask.find(
-                PatientTask.created_at >= month_start,
-                PatientTask.created_at < month_end
-            ).to_list()
-            
-            completed_month = [t for t in month_tasks if t.status == "completed"]
-            avg_score_month = sum(t.quality_score or 0 for t in completed_month) / len(completed_month) if completed_month else 0
-            
-            monthly_trends.append({
-                "month": month_start.strftime("%b"),
-                "averageScore": round(avg_score_month, 1),
-                "completionRate": round((len(completed_month) / len(month_tasks) * 100) if month_tasks else 0, 0),
-                "totalTasks": len(month_tasks)
-            })
-        
-        # Task distribution by type
-        task_distribution_pipeline = [
-            {
-                "$group": {
-                    "_id": "$title",
-                    "count": {"$sum": 1}
-                }
-            },
-            {
-                "$project": {
-                    "type": {"$arrayElemAt": [{"$split": ["$_id", " "]}, 0]},
-                    "count": 1
-                }
-            },
-            {
-                "$group": {
-                    "_id": "$type",
-                    "count": {"$sum": "$count"}
-                }
-            }
-        ]
-        
-        distribution_data = await PatientTask.aggregate(task_distribution_pipeline).to_list()
-        total_dist = sum(d["count"] for d in distribution_data)
-        
+        # Task distribution by type (every task has a title, so total_tasks is the denominator)
         colors = ["#3B82F6", "#10B981", "#F59E0B", "#8B5CF6", "#EF4444"]
         task_distribution = [
             {
                 "name": d["_id"],
-                "value": round((d["count"] / total_dist * 100) if total_dist > 0 else 0, 0),
+                "value": round((d["count"] / total_tasks * 100) if total_tasks > 0 else 0, 0),
                 "color": colors[idx % len(colors)]
             }
-            for idx, d in enumerate(distribution_data[:5])
+            for idx, d in enumerate(facets.get("distribution", []))
         ]
         
         # Top performers
@@ -334,4 +364,3 @@ class AnalyticsService:
             "task_distribution": task_distribution,
             "top_performers": top_performers
         }
-
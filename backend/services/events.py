@@ -0,0 +1,229 @@
+import asyncio
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Set
+from models.task_event import TaskEvent
+from core.config import settings
+
+Deliver = Callable[[Dict[str, Any]], None]
+
+
+class EventBackend(ABC):
+    """Carries published events to every worker's broker.
+    
+    publish() hands an event to the backend; the backend calls deliver() for each
+    event that should reach this worker's subscribers (including its own events).
+    """
+    
+    @abstractmethod
+    async def start(self, deliver: Deliver) -> None:
+        ...
+    
+    @abstractmethod
+    async def publish(self, event: Dict[str, Any]) -> None:
+        ...
+    
+    async def stop(self) -> None:
+        pass
+
+
+class LocalEventBackend(EventBackend):
+    """Single-process fan-out; events published on one worker never reach another"""
+    
+    def __init__(self):
+        self._deliver: Optional[Deliver] = None
+    
+    async def start(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+    
+    async def publish(self, event: Dict[str, Any]) -> None:
+        if self._deliver:
+            self._deliver(event)
+
+
+class MongoChangeStreamBackend(EventBackend):
+    """Multi-worker fan-out: events are inserted into task_events and every worker
+    tails the inserts with a change stream (requires a replica set, e.g. Atlas)"""
+    
+    def __init__(self, retry_seconds: float = 5.0):
+        self.retry_seconds = retry_seconds
+        self._watcher: Optional[asyncio.Task] = None
+    
+    async def start(self, deliver: Deliver) -> None:
+        self._watcher = asyncio.create_task(self._watch(deliver))
+    
+    async def publish(self, event: Dict[str, Any]) -> None:
+        await TaskEvent(**event).insert()
+    
+    async def stop(self) -> None:
+        if self._watcher:
+            self._watcher.cancel()
+            self._watcher = None
+    
+    async def _watch(self, deliver: Deliver) -> None:
+        pipeline = [{"$match": {"operationType": "insert"}}]
+        resume_token = None
+        while True:
+            try:
+                async with TaskEvent.get_motor_collection().watch(
+                    pipeline, resume_after=resume_token
+                ) as stream:
+                    async for change in stream:
+                        resume_token = stream.resume_token
+                        document = change["fullDocument"]
+                        deliver({
+                            "type": document["type"],
+                            "student_id": document.get("student_id"),
+                            "broadcast": document.get("broadcast", False),
+                            "data": document.get("data", {}),
+                            "created_at": document.get("created_at")
+                        })
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Task event stream error: {e}")
+                await asyncio.sleep(self.retry_seconds)
+
+
+class Subscription:
+    """One connected client: a bounded queue of events it is allowed to see"""
+    
+    def __init__(self, user_id: str, role: str, session_token: str, queue_size: int):
+        self.user_id = user_id
+        self.role = role
+        self.session_token = session_token
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.closed = False
+    
+    def wants(self, event: Dict[str, Any]) -> bool:
+        if self.role == "admin":
+            return True
+        return event.get("broadcast") or event.get("student_id") == self.user_id
+    
+    def push(self, event: Dict[str, Any]) -> None:
+        if self.closed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # A client this far behind cannot apply deltas; tell it to refetch instead
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"type": "resync", "data": {}})
+    
+    def revoke(self) -> None:
+        """End the stream: its session is gone, so nothing queued may still be sent.
+        
+        Closing first keeps later pushes from overflowing the queue and replacing the
+        marker with a resync before the stream task gets to run.
+        """
+        self.closed = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait({"type": "unauthorized", "data": {}})
+
+
+class EventBroker:
+    """In-process pub/sub that TaskService publishes to and the SSE route subscribes to"""
+    
+    def __init__(self, backend: Optional[EventBackend] = None):
+        self._backend = backend or LocalEventBackend()
+        self._subscribers: Set[Subscription] = set()
+        self._pending: Dict[str, asyncio.Task] = {}
+        self._stats = {"published": 0, "delivered": 0, "publish_errors": 0, "coalesced": 0}
+    
+    def set_backend(self, backend: EventBackend) -> None:
+        """Replace the fan-out backend (call before start)"""
+        self._backend = backend
+    
+    async def start(self) -> None:
+        await self._backend.start(self._deliver)
+    
+    async def stop(self) -> None:
+        for pending in self._pending.values():
+            pending.cancel()
+        self._pending.clear()
+        await self._backend.stop()
+    
+    def subscribe(self, user_id: str, role: str, session_token: str) -> Subscription:
+        subscription = Subscription(user_id, role, session_token, settings.events_queue_size)
+        self._subscribers.add(subscription)
+        return subscription
+    
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+    
+    def revoke_user(self, user_id: str, keep_token: Optional[str] = None) -> int:
+        """Close this worker's streams for a user's revoked sessions; returns how many.
+        
+        Streams on other workers end at their next session check instead.
+        """
+        revoked = 0
+        for subscription in list(self._subscribers):
+            if subscription.user_id == user_id and subscription.session_token != keep_token:
+                subscription.revoke()
+                self._subscribers.discard(subscription)
+                revoked += 1
+        return revoked
+    
+    async def publish(
+        self,
+        event_type: str,
+        data: Dict[str, Any],
+        student_id: Optional[str] = None,
+        broadcast: bool = False
+    ) -> None:
+        """Publish an event; failures are logged, never raised into the request"""
+        if not settings.events_enabled:
+            return
+        event = {
+            "type": event_type,
+            "student_id": student_id,
+            "broadcast": broadcast,
+            "data": data,
+            "created_at": datetime.utcnow()
+        }
+        try:
+            await self._backend.publish(event)
+            self._stats["published"] += 1
+        except Exception as e:
+            self._stats["publish_errors"] += 1
+            print(f"Event publish error: {e}")
+    
+    def publish_coalesced(self, event_type: str, delay: float) -> None:
+        """Broadcast a data-less event after `delay` seconds; repeats published while one
+        is pending are folded into it, so bursts of writes send at most one per window.
+        
+        Coalescing is per worker: with several workers each sends at most one per window.
+        """
+        if not settings.events_enabled:
+            return
+        if event_type in self._pending:
+            self._stats["coalesced"] += 1
+            return
+        
+        async def send() -> None:
+            await asyncio.sleep(delay)
+            # Clear first so writes made while this publishes schedule the next window
+            self._pending.pop(event_type, None)
+            await self.publish(event_type, {}, broadcast=True)
+        
+        self._pending[event_type] = asyncio.create_task(send())
+    
+    def stats(self) -> dict:
+        return {"subscribers": len(self._subscribers), **self._stats}
+    
+    def _deliver(self, event: Dict[str, Any]) -> None:
+        for subscription in list(self._subscribers):
+            if subscription.wants(event):
+                subscription.push(event)
+                self._stats["delivered"] += 1
+
+
+def _default_backend() -> EventBackend:
+    if settings.events_backend == "mongo":
+        return MongoChangeStreamBackend()
+    return LocalEventBackend()
+
+
+event_broker = EventBroker(_default_backend())
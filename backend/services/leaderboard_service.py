@@ -0,0 +1,220 @@
+import asyncio
+from typing import Dict, List, Any, Optional
+from pymongo import UpdateOne
+from models.patient_task import PatientTask
+from models.task_response import TaskResponse
+from models.student_stats import StudentStats
+
+
+# Recomputes the derived leaderboard fields from the raw counters
+DERIVED_FIELDS_STAGE = {
+    "$set": {
+        "average_score": {
+            "$cond": [
+                {"$gt": ["$tasks_completed", 0]},
+                {"$divide": ["$total_score", "$tasks_completed"]},
+                0
+            ]
+        },
+        "acceptance_rate": {
+            "$cond": [
+                {"$gt": ["$total_responses", 0]},
+                {"$multiply": [{"$divide": ["$accepted_responses", "$total_responses"]}, 100]},
+                0
+            ]
+        },
+        "updated_at": "$$NOW"
+    }
+}
+
+COUNTER_FIELDS = ["tasks_completed", "total_score", "total_responses", "accepted_responses"]
+
+
+class LeaderboardService:
+    """Maintains the student_stats collection incrementally so rankings never scan all tasks"""
+
+    @staticmethod
+    def _counter_update(deltas: Dict[str, float]) -> List[Dict[str, Any]]:
+        """Pipeline update that adds deltas to the counters and refreshes derived fields"""
+        counters = {
+            field: {"$add": [{"$ifNull": [f"${field}", 0]}, deltas.get(field, 0)]}
+            for field in COUNTER_FIELDS
+        }
+        return [{"$set": counters}, DERIVED_FIELDS_STAGE]
+
+    @staticmethod
+    async def _apply(student_id: str, deltas: Dict[str, float]) -> None:
+        """Atomically add deltas to a student's counters and refresh derived fields"""
+        await StudentStats.get_motor_collection().update_one(
+            {"student_id": student_id},
+            LeaderboardService._counter_update(deltas),
+            upsert=True
+        )
+
+    @staticmethod
+    def score_deltas(previous_score: Optional[float], new_score: float) -> Dict[str, float]:
+        """Counter changes for a (re)score of a completed task"""
+        if previous_score is None:
+            return {"tasks_completed": 1, "total_score": new_score}
+        return {"total_score": new_score - previous_score}
+
+    @staticmethod
+    async def record_response(student_id: str, action: str) -> None:
+        """Count an accept/reject/complete response towards the acceptance rate"""
+        await LeaderboardService._apply(student_id, {
+            "total_responses": 1,
+            "accepted_responses": 1 if action == "accepted" else 0
+        })
+
+    @staticmethod
+    async def record_score(student_id: str, previous_score: Optional[float], new_score: float) -> None:
+        """Apply a (re)score of a completed task to the student's average"""
+        await LeaderboardService._apply(
+            student_id, LeaderboardService.score_deltas(previous_score, new_score)
+        )
+
+    @staticmethod
+    async def record_scores(deltas_by_student: Dict[str, Dict[str, float]]) -> None:
+        """Apply summed score deltas for many students with one bulk_write"""
+        if not deltas_by_student:
+            return
+        await StudentStats.get_motor_collection().bulk_write([
+            UpdateOne(
+                {"student_id": student_id},
+                LeaderboardService._counter_update(deltas),
+                upsert=True
+            )
+            for student_id, deltas in deltas_by_student.items()
+        ], ordered=False)
+
+    @staticmethod
+    async def get_ranked_stats(limit: Optional[int] = None) -> List[StudentStats]:
+        """Ranked leaderboard rows, best first"""
+        query = StudentStats.find(StudentStats.tasks_completed > 0).sort(
+            -StudentStats.average_score,
+            -StudentStats.tasks_completed,
+            +StudentStats.student_id
+        )
+        if limit is not None:
+            query = query.limit(limit)
+        return await query.to_list()
+
+    @staticmethod
+    async def get_student_rank(student_id: str) -> Dict[str, Any]:
+        """Rank, ranked-student count and percentile for one student via counted queries"""
+        total, stats = await asyncio.gather(
+            StudentStats.find(StudentStats.tasks_completed > 0).count(),
+            StudentStats.find_one(
+                StudentStats.student_id == student_id,
+                StudentStats.tasks_completed > 0
+            )
+        )
+        
+        if stats:
+            # Students ahead in (average_score desc, tasks_completed desc, student_id asc) order
+            ahead = await StudentStats.find({
+                "tasks_completed": {"$gt": 0},
+                "$or": [
+                    {"average_score": {"$gt": stats.average_score}},
+                    {
+                        "average_score": stats.average_score,
+                        "tasks_completed": {"$gt": stats.tasks_completed}
+                    },
+                    {
+                        "average_score": stats.average_score,
+                        "tasks_completed": stats.tasks_completed,
+                        "student_id": {"$lt": student_id}
+                    }
+                ]
+            }).count()
+            rank = ahead + 1
+        else:
+            rank = total + 1
+        
+        return {
+            "rank": rank,
+            "total": total + 1,
+            "percentile": round((1 - (rank - 1) / (total + 1)) * 100, 0) if total else 0
+        }
+    
+    @staticmethod
+    def _task_stats_pipeline(student_ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Aggregate scored completed tasks per student and merge them into student_stats"""
+        match = {
+            "status": "completed",
+            "quality_score": {"$ne": None}
+        }
+        if student_ids is not None:
+            match["assigned_student_id"] = {"$in": student_ids}
+        return [
+            {"$match": match},
+            {
+                "$group": {
+                    "_id": "$assigned_student_id",
+                    "tasks_completed": {"$sum": 1},
+                    "total_score": {"$sum": "$quality_score"}
+                }
+            },
+            {"$project": {"_id": 0, "student_id": "$_id", "tasks_completed": 1, "total_score": 1}},
+            {
+                "$merge": {
+                    "into": StudentStats.Settings.name,
+                    "on": "student_id",
+                    "whenMatched": "merge",
+                    "whenNotMatched": "insert"
+                }
+            }
+        ]
+    
+    @staticmethod
+    async def refresh_students(student_ids: List[str]) -> None:
+        """Recompute the score counters of a few students from their tasks.
+        
+        Only for when the exact previous scores are unknown: a record_score delta that
+        lands after the recompute read its tasks is counted twice.
+        """
+        if not student_ids:
+            return
+        await PatientTask.aggregate(LeaderboardService._task_stats_pipeline(student_ids)).to_list()
+        defaults = {field: {"$ifNull": [f"${field}", 0]} for field in COUNTER_FIELDS}
+        await StudentStats.get_motor_collection().update_many(
+            {"student_id": {"$in": student_ids}},
+            [{"$set": defaults}, DERIVED_FIELDS_STAGE]
+        )
+    
+    @staticmethod
+    async def rebuild() -> None:
+        """Recompute student_stats from patient_tasks and task_responses (server-side)"""
+        collection = StudentStats.get_motor_collection()
+        stats_name = StudentStats.Settings.name
+        await collection.delete_many({})
+
+        await PatientTask.aggregate(LeaderboardService._task_stats_pipeline()).to_list()
+
+        response_pipeline = [
+            {
+                "$group": {
+                    "_id": "$student_id",
+                    "total_responses": {"$sum": 1},
+                    "accepted_responses": {
+                        "$sum": {"$cond": [{"$eq": ["$action", "accepted"]}, 1, 0]}
+                    }
+                }
+            },
+            {"$project": {"_id": 0, "student_id": "$_id", "total_responses": 1, "accepted_responses": 1}},
+            {"$merge": {"into": stats_name, "on": "student_id", "whenMatched": "merge", "whenNotMatched": "insert"}}
+        ]
+        await TaskResponse.aggregate(response_pipeline).to_list()
+
+        defaults = {field: {"$ifNull": [f"${field}", 0]} for field in COUNTER_FIELDS}
+        await collection.update_many({}, [{"$set": defaults}, DERIVED_FIELDS_STAGE])
+
+    @staticmethod
+    async def ensure_built() -> None:
+        """Build the leaderboard on first start against an existing database"""
+        if await StudentStats.find_one() is not None:
+            return
+        if await PatientTask.find_one() is None and await TaskResponse.find_one() is None:
+            return
+        await LeaderboardService.rebuild()
+        print("✅ Built student leaderboard")
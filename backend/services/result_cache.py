@@ -0,0 +1,124 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Tuple
+from core.config import settings
+
+
+class DataVersion:
+    """In-process write counter; TaskService bumps it after every task write.
+    
+    Each touched student also records the global value at its last write, so
+    per-student views (task lists, ETags) only change when that student's data does.
+    Other workers do not see this worker's bumps, which is why cached results
+    also expire after result_cache_max_age_seconds.
+    """
+    
+    def __init__(self):
+        self.value = 0
+        self._students: Dict[str, int] = {}
+    
+    def bump(self, student_ids: Iterable[str] = ()) -> None:
+        self.value += 1
+        for student_id in student_ids:
+            self._students[student_id] = self.value
+    
+    def for_student(self, student_id: str) -> int:
+        return self._students.get(student_id, 0)
+
+
+data_version = DataVersion()
+
+
+class ResultCache:
+    """Caches expensive results per key, tagged with the data version they were computed at.
+    
+    - Fresh: same data version and younger than max_age -> served directly.
+    - Stale (version moved on or max_age passed) but younger than max_age + stale window ->
+      served immediately while one background task recomputes it.
+    - Missing or older than that -> computed, with concurrent callers sharing one computation.
+    """
+    
+    def __init__(self, name: str, max_entries: int, max_age_seconds: float, stale_seconds: float):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self.stale_seconds = stale_seconds
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (value, version, computed_at)
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._stats = {"hits": 0, "stale_hits": 0, "misses": 0, "coalesced": 0, "refresh_errors": 0}
+    
+    async def get_or_compute(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Tuple[Any, int]:
+        """Return (value, data version it was computed at) for key, computing at most once at a time.
+        
+        A stale value carries its older version, so callers deriving an ETag from the
+        version never label an old body with the current version.
+        """
+        if not settings.result_cache_enabled:
+            version = data_version.value
+            return await compute(), version
+        
+        item = self._entries.get(key)
+        if item is not None:
+            value, version, computed_at = item
+            age = time.monotonic() - computed_at
+            if version == data_version.value and age < self.max_age_seconds:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return value, version
+            if age < self.max_age_seconds + self.stale_seconds:
+                self._entries.move_to_end(key)
+                self._stats["stale_hits"] += 1
+                self._start(key, compute, background=True)
+                return value, version
+        
+        if key in self._inflight:
+            self._stats["coalesced"] += 1
+        else:
+            self._stats["misses"] += 1
+        # shield: a cancelled request must not cancel the computation other callers share
+        return await asyncio.shield(self._start(key, compute))
+    
+    def invalidate(self) -> None:
+        """Drop every entry (in-flight computations still complete)"""
+        self._entries.clear()
+    
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "inflight": len(self._inflight), **self._stats}
+    
+    def _start(self, key: Hashable, compute: Callable[[], Awaitable[Any]], background: bool = False) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._compute(key, compute))
+            self._inflight[key] = task
+            if background:
+                task.add_done_callback(self._log_refresh_error)
+        return task
+    
+    async def _compute(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Tuple[Any, int]:
+        # Tag the result with the version seen *before* computing, so a write that lands
+        # mid-computation leaves the entry stale rather than hiding the write
+        version = data_version.value
+        try:
+            value = await compute()
+            self._entries[key] = (value, version, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return value, version
+        finally:
+            self._inflight.pop(key, None)
+    
+    def _log_refresh_error(self, task: asyncio.Task) -> None:
+        if task.cancelled() or task.exception() is None:
+            return
+        self._stats["refresh_errors"] += 1
+        print(f"Result cache '{self.name}' refresh error: {task.exception()}")
+
+
+analytics_cache = ResultCache(
+    "analytics",
+    max_entries=settings.result_cache_max_entries,
+    max_age_seconds=settings.result_cache_max_age_seconds,
+    stale_seconds=settings.result_cache_stale_seconds
+)
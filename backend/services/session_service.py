@@ -0,0 +1,91 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Optional
+from beanie.odm.operators.find.comparison import In
+from models.session import Session
+from models.stream_ticket import StreamTicket
+from core.config import settings
+from core.security import generate_session_token, get_session_expiry
+from core.session_cache import get_session_cache
+from services.events import event_broker
+
+
+class SessionService:
+    
+    @staticmethod
+    async def create_session(user_id: str) -> Session:
+        """Create a session for a user, evicting their oldest ones beyond the cap"""
+        session = Session(
+            user_id=user_id,
+            token=generate_session_token(),
+            expires_at=get_session_expiry()
+        )
+        await session.insert()
+        await SessionService.enforce_session_cap(user_id)
+        return session
+    
+    @staticmethod
+    async def enforce_session_cap(user_id: str) -> int:
+        """Delete a user's sessions beyond max_sessions_per_user (oldest first)"""
+        if settings.max_sessions_per_user <= 0:
+            return 0
+        
+        overflow = await Session.find(Session.user_id == user_id).sort(
+            -Session.created_at
+        ).skip(settings.max_sessions_per_user).to_list()
+        if not overflow:
+            return 0
+        
+        await Session.find(In(Session.id, [s.id for s in overflow])).delete()
+        cache = get_session_cache()
+        for session in overflow:
+            await cache.delete(session.token)
+        return len(overflow)
+    
+    @staticmethod
+    async def revoke_user_sessions(user_id: str, keep_token: Optional[str] = None) -> int:
+        """Delete all of a user's sessions in one delete_many, optionally keeping one token"""
+        query = Session.find(Session.user_id == user_id)
+        if keep_token:
+            query = query.find(Session.token != keep_token)
+        result = await query.delete()
+        await get_session_cache().delete_user(user_id)
+        event_broker.revoke_user(user_id, keep_token)
+        return result.deleted_count if result else 0
+    
+    @staticmethod
+    async def create_stream_ticket(session_token: str) -> StreamTicket:
+        """Issue a single-use ticket that opens an event stream for this session"""
+        ticket = StreamTicket(
+            ticket=generate_session_token(),
+            session_token=session_token,
+            expires_at=datetime.utcnow() + timedelta(seconds=settings.events_ticket_ttl_seconds)
+        )
+        await ticket.insert()
+        return ticket
+    
+    @staticmethod
+    async def redeem_stream_ticket(ticket: str) -> Optional[str]:
+        """Consume a ticket atomically; returns its session token, or None if unknown or expired"""
+        document = await StreamTicket.get_motor_collection().find_one_and_delete(
+            {"ticket": ticket, "expires_at": {"$gt": datetime.utcnow()}}
+        )
+        return document["session_token"] if document else None
+    
+    @staticmethod
+    async def delete_expired() -> int:
+        """Delete every expired session"""
+        result = await Session.find(Session.expires_at < datetime.utcnow()).delete()
+        return result.deleted_count if result else 0
+    
+    @staticmethod
+    async def run_sweeper(interval_seconds: int) -> None:
+        """Periodically delete expired sessions (for stores without TTL index support)"""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                deleted = await SessionService.delete_expired()
+                if deleted:
+                    print(f"🧹 Removed {deleted} expired sessions")
+            except Exception as e:
+                print(f"Session sweep error: {e}")
@@ -1,19 +1,50 @@
-from typing import List, Optional
+import asyncio
+import base64
+import json
+from typing import Any, Dict, List, Optional, Tuple, Union
 from datetime import datetime
-from models.patient_task import PatientTask
+from bson import ObjectId
+from beanie import PydanticObjectId, UpdateResponse
+from beanie.odm.operators.update.general import Set
+from models.patient_task import PatientTask, PatientTaskSummary, derive_task_type
 from models.task_response import TaskResponse
 from models.analytics_log import AnalyticsLog
 from models.user import User
-from schemas.task import TaskCreateSchema, TaskScoreSchema
+from core.config import settings
+from services.leaderboard_service import LeaderboardService
+from services.analytics_log_writer import analytics_log_writer
+from services.user_service import UserService
+from services.result_cache import data_version
+from services.events import event_broker
+from schemas.task import TaskCreateSchema, TaskScoreSchema, TaskScoreItemSchema
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from beanie.odm.operators.find.comparison import In
+
+BULK_INSERT_CHUNK_SIZE = 1000
 
 
 class TaskService:
     
+    @staticmethod
+    def _event_data(task: Union[PatientTask, PatientTaskSummary]) -> Dict[str, Any]:
+        """Scalar task fields pushed to live clients as a delta"""
+        return {
+            "id": str(task.id),
+            "title": task.title,
+            "assigned_student_id": task.assigned_student_id,
+            "status": task.status,
+            "quality_score": task.quality_score,
+            "created_at": task.created_at,
+            "completed_at": task.completed_at
+        }
+    
     @staticmethod
     async def create_task(task_data: TaskCreateSchema, admin_id: str) -> PatientTask:
         """Create a new patient-linked task"""
         task = PatientTask(
             title=task_data.title,
+            task_type=derive_task_type(task_data.title),
             description=task_data.description,
             patient=task_data.patient.dict(),
             assigned_student_id=task_data.assigned_student_id,
@@ -22,158 +53,448 @@ class TaskService:
         await task.insert()
         
         # Log analytics
-        await AnalyticsLog(
+        await analytics_log_writer.write(AnalyticsLog(
             user_id=admin_id,
             task_id=str(task.id),
             role="admin",
             action="task_created",
             metadata={"title": task.title, "student_id": task.assigned_student_id}
-        ).insert()
+        ))
+        data_version.bump([task.assigned_student_id])
+        await event_broker.publish(
+            "task_created", TaskService._event_data(task), student_id=task.assigned_student_id
+        )
         
         return task
     
     @staticmethod
-    async def get_admin_tasks() -> List[PatientTask]:
-        """Get all tasks for admin view"""
+    async def create_tasks_bulk(items: List[TaskCreateSchema], admin_id: str) -> List[Dict[str, Any]]:
+        """Create many tasks with one student lookup and chunked insert_many calls"""
+        students = await UserService.find_students(item.assigned_student_id for item in items)
+        
+        results: List[Dict[str, Any]] = []
+        pending = []  # (result index, task)
+        for index, item in enumerate(items):
+            if item.assigned_student_id not in students:
+                results.append({"index": index, "id": None, "error": "Assigned student not found"})
+                continue
+            results.append({"index": index, "id": None, "error": None})
+            pending.append((index, PatientTask(
+                title=item.title,
+                task_type=derive_task_type(item.title),
+                description=item.description,
+                patient=item.patient.dict(),
+                assigned_student_id=item.assigned_student_id,
+                status="pending"
+            )))
+        
+        for start in range(0, len(pending), BULK_INSERT_CHUNK_SIZE):
+            chunk = pending[start:start + BULK_INSERT_CHUNK_SIZE]
+            # Ids are assigned up front so a partially failed chunk still says which tasks exist
+            for _, task in chunk:
+                task.id = PydanticObjectId()
+            errors: Dict[int, str] = {}  # position in chunk -> error
+            try:
+                # Unordered: one bad document does not stop the rest of the chunk
+                await PatientTask.insert_many([task for _, task in chunk], ordered=False)
+            except BulkWriteError as e:
+                for write_error in e.details.get("writeErrors", []):
+                    errors[write_error["index"]] = f"Insert failed: {write_error.get('errmsg')}"
+            except Exception as e:
+                # Outcome unknown (e.g. connection lost): report the whole chunk as failed
+                errors = {position: f"Insert failed: {e}" for position in range(len(chunk))}
+            
+            logs = []
+            student_ids = set()
+            for position, (index, task) in enumerate(chunk):
+                if position in errors:
+                    results[index]["error"] = errors[position]
+                    continue
+                results[index]["id"] = str(task.id)
+                student_ids.add(task.assigned_student_id)
+                logs.append(AnalyticsLog(
+                    user_id=admin_id,
+                    task_id=str(task.id),
+                    role="admin",
+                    action="task_created",
+                    metadata={"title": task.title, "student_id": task.assigned_student_id}
+                ))
+            if logs:
+                # The tasks are committed; a failed audit write must not turn this into a 500
+                await analytics_log_writer.write_many(logs)
+                data_version.bump(student_ids)
+        
+        # One event per student rather than one per task
+        created: Dict[str, List[str]] = {}
+        for index, task in pending:
+            if results[index]["id"]:
+                created.setdefault(task.assigned_student_id, []).append(results[index]["id"])
+        await asyncio.gather(*(
+            event_broker.publish("tasks_created", {"task_ids": task_ids}, student_id=student_id)
+            for student_id, task_ids in created.items()
+        ))
+        
+        return results
+    
+    @staticmethod
+    def encode_cursor(task: PatientTask) -> str:
+        """Opaque keyset cursor pointing just after a task"""
+        raw = json.dumps({"c": task.created_at.isoformat(), "i": str(task.id)})
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+    
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+        """Decode a cursor produced by encode_cursor"""
         try:
-            tasks = await PatientTask.find().sort(-PatientTask.created_at).to_list()
-            return tasks
-        except Exception as e:
-            print(f"Error in get_admin_tasks: {e}")
-            import traceback
-            traceback.print_exc()
-            return []
+            raw = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+            return datetime.fromisoformat(raw["c"]), ObjectId(raw["i"])
+        except Exception:
+            raise ValueError("Invalid cursor")
+    
+    @staticmethod
+    async def get_admin_tasks(
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        status: Optional[str] = None,
+        student_id: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        summary: bool = False
+    ) -> Tuple[List[Union[PatientTask, PatientTaskSummary]], Optional[str]]:
+        """Get one page of tasks for admin view, newest first, plus the next page cursor"""
+        filters = []
+        if status:
+            filters.append({"status": status})
+        if student_id:
+            filters.append({"assigned_student_id": student_id})
+        if created_from:
+            filters.append({"created_at": {"$gte": created_from}})
+        if created_to:
+            filters.append({"created_at": {"$lt": created_to}})
+        if cursor:
+            created_at, task_oid = TaskService.decode_cursor(cursor)
+            filters.append({
+                "$or": [
+                    {"created_at": {"$lt": created_at}},
+                    {"created_at": created_at, "_id": {"$lt": task_oid}}
+                ]
+            })
+        query = {"$and": filters} if filters else {}
+        
+        # Fetch one extra row to know whether another page exists
+        find = PatientTask.find(query).sort(
+            -PatientTask.created_at, -PatientTask.id
+        ).limit(limit + 1)
+        if summary:
+            find = find.project(PatientTaskSummary)
+        tasks = await find.to_list()
+        
+        next_cursor = None
+        if len(tasks) > limit:
+            tasks = tasks[:limit]
+            next_cursor = TaskService.encode_cursor(tasks[-1])
+        return tasks, next_cursor
     
     @staticmethod
-    async def get_student_tasks(student_id: str) -> List[PatientTask]:
+    async def get_student_tasks(
+        student_id: str,
+        summary: bool = False
+    ) -> List[Union[PatientTask, PatientTaskSummary]]:
         """Get all tasks assigned to a specific student"""
-        return await PatientTask.find(
+        find = PatientTask.find(
             PatientTask.assigned_student_id == student_id
-        ).sort(-PatientTask.created_at).to_list()
+        ).sort(-PatientTask.created_at)
+        if summary:
+            find = find.project(PatientTaskSummary)
+        return await find.to_list()
     
     @staticmethod
-    async def accept_task(task_id: str, student_id: str) -> PatientTask:
-        """Accept a pending task"""
-        task = await PatientTask.get(task_id)
+    async def get_task(task_id: str) -> PatientTask:
+        """Get a single full task"""
+        try:
+            task = await PatientTask.get(task_id)
+        except Exception:
+            task = None
         if not task:
             raise ValueError("Task not found")
+        return task
+    
+    @staticmethod
+    async def _transition(
+        task_id: str,
+        expected_status: str,
+        updates: dict,
+        student_id: Optional[str] = None,
+        status_error: str = "Invalid task status",
+        return_previous: bool = False
+    ) -> PatientTask:
+        """Atomically apply updates if the task is in expected_status (and assigned to student_id)"""
+        try:
+            task_oid = PydanticObjectId(task_id)
+        except Exception:
+            raise ValueError("Task not found")
         
-        if task.assigned_student_id != student_id:
-            raise ValueError("Task not assigned to this student")
-        
-        if task.status != "pending":
-            raise ValueError("Task is not pending")
+        criteria = [PatientTask.id == task_oid, PatientTask.status == expected_status]
+        if student_id is not None:
+            criteria.append(PatientTask.assigned_student_id == student_id)
         
-        task.status = "accepted"
-        await task.save()
+        # One find_one_and_update; concurrent duplicates find no matching document
+        task = await PatientTask.find_one(*criteria).update(
+            Set(updates),
+            response_type=UpdateResponse.OLD_DOCUMENT if return_previous else UpdateResponse.NEW_DOCUMENT
+        )
+        if task:
+            return task
         
-        # Create response
-        await TaskResponse(
-            task_id=task_id,
-            student_id=student_id,
-            action="accepted"
-        ).insert()
+        # Only a failed transition pays for a second read, to explain why
+        current = await PatientTask.get(task_oid)
+        if not current:
+            raise ValueError("Task not found")
+        if student_id is not None and current.assigned_student_id != student_id:
+            raise ValueError("Task not assigned to this student")
+        raise ValueError(status_error)
+    
+    @staticmethod
+    async def accept_task(task_id: str, student_id: str) -> PatientTask:
+        """Accept a pending task"""
+        task = await TaskService._transition(
+            task_id, "pending", {"status": "accepted"},
+            student_id=student_id, status_error="Task is not pending"
+        )
         
-        # Log analytics
-        await AnalyticsLog(
-            user_id=student_id,
-            task_id=task_id,
-            role="student",
-            action="task_accepted"
-        ).insert()
+        # Response, leaderboard and audit writes are independent; issue them together
+        await asyncio.gather(
+            TaskResponse(
+                task_id=task_id,
+                student_id=student_id,
+                action="accepted"
+            ).insert(),
+            LeaderboardService.record_response(student_id, "accepted"),
+            analytics_log_writer.write(AnalyticsLog(
+                user_id=student_id,
+                task_id=task_id,
+                role="student",
+                action="task_accepted"
+            ))
+        )
+        data_version.bump([student_id])
+        await event_broker.publish(
+            "task_accepted", TaskService._event_data(task), student_id=student_id
+        )
         
         return task
     
     @staticmethod
     async def reject_task(task_id: str, student_id: str, reject_reason: str) -> PatientTask:
         """Reject a pending task"""
-        task = await PatientTask.get(task_id)
-        if not task:
-            raise ValueError("Task not found")
+        task = await TaskService._transition(
+            task_id, "pending", {"status": "rejected"},
+            student_id=student_id, status_error="Task is not pending"
+        )
         
-        if task.assigned_student_id != student_id:
-            raise ValueError("Task not assigned to this student")
+        # Response, leaderboard and audit writes are independent; issue them together
+        await asyncio.gather(
+            TaskResponse(
+                task_id=task_id,
+                student_id=student_id,
+                action="rejected",
+                reject_reason=reject_reason
+            ).insert(),
+            LeaderboardService.record_response(student_id, "rejected"),
+            analytics_log_writer.write(AnalyticsLog(
+                user_id=student_id,
+                task_id=task_id,
+                role="student",
+                action="task_rejected",
+                metadata={"reason": reject_reason}
+            ))
+        )
+        data_version.bump([student_id])
+        await event_broker.publish(
+            "task_rejected", TaskService._event_data(task), student_id=student_id
+        )
         
-        if task.status != "pending":
-            raise ValueError("Task is not pending")
+        return task
+    
+    @staticmethod
+    async def complete_task(task_id: str, student_id: str) -> PatientTask:
+        """Mark an accepted task as completed"""
+        task = await TaskService._transition(
+            task_id, "accepted", {"status": "completed", "completed_at": datetime.utcnow()},
+            student_id=student_id, status_error="Task must be accepted before completion"
+        )
         
-        task.status = "rejected"
-        await task.save()
+        # Response, leaderboard and audit writes are independent; issue them together
+        await asyncio.gather(
+            TaskResponse(
+                task_id=task_id,
+                student_id=student_id,
+                action="completed"
+            ).insert(),
+            LeaderboardService.record_response(student_id, "completed"),
+            analytics_log_writer.write(AnalyticsLog(
+                user_id=student_id,
+                task_id=task_id,
+                role="student",
+                action="task_completed"
+            ))
+        )
+        data_version.bump([student_id])
+        await event_broker.publish(
+            "task_completed", TaskService._event_data(task), student_id=student_id
+        )
         
-        # Create response
-        await TaskResponse(
-            task_id=task_id,
-            student_id=student_id,
-            action="rejected",
-            reject_reason=reject_reason
-        ).insert()
+        return task
+    
+    @staticmethod
+    async def score_task(task_id: str, score_data: TaskScoreSchema, admin_id: str) -> PatientTask:
+        """Assign a quality score to a completed task (admin only)"""
+        # The pre-update document tells us whether this is a first score or a re-score
+        task = await TaskService._transition(
+            task_id, "completed", {"quality_score": score_data.quality_score},
+            status_error="Task must be completed before scoring", return_previous=True
+        )
+        previous_score = task.quality_score
+        task.quality_score = score_data.quality_score
         
-        # Log analytics
-        await AnalyticsLog(
-            user_id=student_id,
-            task_id=task_id,
-            role="student",
-            action="task_rejected",
-            metadata={"reason": reject_reason}
-        ).insert()
+        # Leaderboard and audit writes are independent; issue them together
+        await asyncio.gather(
+            LeaderboardService.record_score(
+                task.assigned_student_id, previous_score, task.quality_score
+            ),
+            analytics_log_writer.write(AnalyticsLog(
+                user_id=admin_id,
+                task_id=task_id,
+                role="admin",
+                action="task_scored",
+                metadata={"score": score_data.quality_score}
+            ))
+        )
+        data_version.bump([task.assigned_student_id])
+        await event_broker.publish(
+            "task_scored", TaskService._event_data(task), student_id=task.assigned_student_id
+        )
+        # Every student refetches on leaderboard_updated, so scoring sessions send one per window
+        event_broker.publish_coalesced("leaderboard_updated", settings.events_leaderboard_coalesce_seconds)
         
         return task
     
     @staticmethod
-    async def complete_task(task_id: str, student_id: str) -> PatientTask:
-        """Mark an accepted task as completed"""
-        task = await PatientTask.get(task_id)
-        if not task:
-            raise ValueError("Task not found")
+    async def score_tasks_bulk(items: List[TaskScoreItemSchema], admin_id: str) -> List[Dict[str, Any]]:
+        """Score many completed tasks with one bulk_write and one batch of leaderboard deltas"""
+        results: List[Dict[str, Any]] = []
+        object_ids = {}
+        for index, item in enumerate(items):
+            results.append({"index": index, "id": item.task_id, "error": None})
+            try:
+                object_ids[item.task_id] = PydanticObjectId(item.task_id)
+            except Exception:
+                results[index]["error"] = "Task not found"
         
-        if task.assigned_student_id != student_id:
-            raise ValueError("Task not assigned to this student")
+        # One projected read to validate every task up front
+        tasks = await PatientTask.find(
+            In(PatientTask.id, list(object_ids.values()))
+        ).project(PatientTaskSummary).to_list()
+        task_map = {str(t.id): t for t in tasks}
         
-        if task.status != "accepted":
-            raise ValueError("Task must be accepted before completion")
+        # Each update is conditional on the score read above, so the previous score behind
+        # every leaderboard delta is exact even if a task is re-scored concurrently
+        operations = []
+        pending = []  # (result index, task as read, new score), parallel to operations
+        for index, item in enumerate(items):
+            if results[index]["error"]:
+                continue
+            task = task_map.get(item.task_id)
+            if not task:
+                results[index]["error"] = "Task not found"
+                continue
+            if task.status != "completed":
+                results[index]["error"] = "Task must be completed before scoring"
+                continue
+            
+            operations.append(UpdateOne(
+                {"_id": object_ids[item.task_id], "status": "completed", "quality_score": task.quality_score},
+                {"$set": {"quality_score": item.quality_score}}
+            ))
+            pending.append((index, task, item.quality_score))
         
-        task.status = "completed"
-        task.completed_at = datetime.utcnow()
-        await task.save()
+        if not operations:
+            return results
         
-        # Create response
-        await TaskResponse(
-            task_id=task_id,
-            student_id=student_id,
-            action="completed"
-        ).insert()
+        matched: Optional[int] = None  # None: outcome unknown
+        write_errors: Dict[int, str] = {}  # position in operations -> error
+        try:
+            result = await PatientTask.get_motor_collection().bulk_write(operations, ordered=False)
+            matched = result.matched_count
+        except BulkWriteError as e:
+            matched = e.details.get("nMatched", 0)
+            for write_error in e.details.get("writeErrors", []):
+                write_errors[write_error["index"]] = write_error.get("errmsg")
+        except Exception as e:
+            print(f"Bulk score write error: {e}")
         
-        # Log analytics
-        await AnalyticsLog(
-            user_id=student_id,
-            task_id=task_id,
-            role="student",
-            action="task_completed"
-        ).insert()
+        applied = []
+        for position, (index, task, score) in enumerate(pending):
+            if position in write_errors:
+                results[index]["error"] = f"Score failed: {write_errors[position]}"
+            else:
+                applied.append((index, task, score))
         
-        return task
-    
-    @staticmethod
-    async def score_task(task_id: str, score_data: TaskScoreSchema, admin_id: str) -> PatientTask:
-        """Assign a quality score to a completed task (admin only)"""
-        task = await PatientTask.get(task_id)
-        if not task:
-            raise ValueError("Task not found")
+        recompute = []
+        if matched != len(applied):
+            # Some updates did not match (or the outcome is unknown); re-read to see which landed
+            current = await PatientTask.find(
+                In(PatientTask.id, [object_ids[items[index].task_id] for index, _, _ in applied])
+            ).project(PatientTaskSummary).to_list()
+            current_scores = {str(t.id): t.quality_score for t in current}
+            landed = []
+            for index, task, score in applied:
+                if current_scores.get(items[index].task_id) == score:
+                    landed.append((index, task, score))
+                else:
+                    results[index]["error"] = "Task was scored concurrently; retry"
+            applied = []
+            if matched == len(landed):
+                applied = landed
+            else:
+                # Another request set the same score, so which write landed (and whose delta
+                # applies) is unknown; recompute those students rather than guess
+                recompute = landed
         
-        if task.status != "completed":
-            raise ValueError("Task must be completed before scoring")
+        deltas: Dict[str, Dict[str, float]] = {}
+        logs = []
+        for index, task, score in applied:
+            student_deltas = deltas.setdefault(task.assigned_student_id, {})
+            for field, delta in LeaderboardService.score_deltas(task.quality_score, score).items():
+                student_deltas[field] = student_deltas.get(field, 0) + delta
+        for index, task, score in applied + recompute:
+            logs.append(AnalyticsLog(
+                user_id=admin_id,
+                task_id=items[index].task_id,
+                role="admin",
+                action="task_scored",
+                metadata={"score": score}
+            ))
+        if not logs:
+            return results
         
-        task.quality_score = score_data.quality_score
-        await task.save()
+        student_ids = {task.assigned_student_id for _, task, _ in applied + recompute}
+        await asyncio.gather(
+            analytics_log_writer.write_many(logs),
+            LeaderboardService.record_scores(deltas),
+            LeaderboardService.refresh_students(
+                list({task.assigned_student_id for _, task, _ in recompute})
+            )
+        )
+        data_version.bump(student_ids)
         
-        # Log analytics
-        await AnalyticsLog(
-            user_id=admin_id,
-            task_id=task_id,
-            role="admin",
-            action="task_scored",
-            metadata={"score": score_data.quality_score}
-        ).insert()
+        scored: Dict[str, List[str]] = {}
+        for index, task, _ in applied + recompute:
+            scored.setdefault(task.assigned_student_id, []).append(items[index].task_id)
+        await asyncio.gather(*(
+            event_broker.publish("tasks_scored", {"task_ids": task_ids}, student_id=student_id)
+            for student_id, task_ids in scored.items()
+        ))
+        event_broker.publish_coalesced("leaderboard_updated", settings.events_leaderboard_coalesce_seconds)
         
-        return task
-
+        return results
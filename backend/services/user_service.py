@@ -0,0 +1,79 @@
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+from bson import ObjectId
+from models.user import User, UserName
+from core.config import settings
+
+
+# user_id -> (name, cached_until), least recently used first. Entries only expire by TTL:
+# the API never renames or deletes users (the seed/datagen scripts that do run out of process)
+_name_cache: "OrderedDict[str, tuple]" = OrderedDict()
+
+
+def _cache_names(names: Dict[str, str]) -> None:
+    """Store freshly read names as most recently used, then evict beyond the size limit"""
+    cached_until = time.monotonic() + settings.user_name_cache_ttl_seconds
+    for user_id, name in names.items():
+        _name_cache[user_id] = (name, cached_until)
+        # Reassigning an existing key keeps its old position, so move it explicitly
+        _name_cache.move_to_end(user_id)
+    while len(_name_cache) > settings.user_name_cache_size:
+        _name_cache.popitem(last=False)
+
+
+class UserService:
+    
+    @staticmethod
+    async def resolve_names(user_ids: Iterable[str]) -> Dict[str, str]:
+        """Map user ids to names, fetching only uncached ids with one projected $in query"""
+        now = time.monotonic()
+        names = {}
+        missing = []
+        for user_id in set(filter(None, user_ids)):
+            cached = _name_cache.get(user_id)
+            if cached and cached[1] > now:
+                _name_cache.move_to_end(user_id)
+                names[user_id] = cached[0]
+            else:
+                missing.append(user_id)
+        
+        object_ids = []
+        for user_id in missing:
+            try:
+                object_ids.append(ObjectId(user_id))
+            except Exception:
+                continue
+        
+        if object_ids:
+            users = await User.find({"_id": {"$in": object_ids}}).project(UserName).to_list()
+            fetched = {str(user.id): user.name for user in users}
+            _cache_names(fetched)
+            names.update(fetched)
+        
+        return names
+    
+    @staticmethod
+    async def find_students(user_ids: Iterable[str]) -> Dict[str, str]:
+        """Names of the given ids that belong to students, in one projected $in query"""
+        object_ids = []
+        for user_id in set(filter(None, user_ids)):
+            try:
+                object_ids.append(ObjectId(user_id))
+            except Exception:
+                continue
+        if not object_ids:
+            return {}
+        
+        students = await User.find(
+            {"_id": {"$in": object_ids}, "role": "student"}
+        ).project(UserName).to_list()
+        names = {str(student.id): student.name for student in students}
+        _cache_names(names)
+        return names
+    
+    @staticmethod
+    async def resolve_name(user_id: str) -> Optional[str]:
+        """Name of a single user, or None if unknown"""
+        return (await UserService.resolve_names([user_id])).get(user_id)
+
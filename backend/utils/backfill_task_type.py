@@ -0,0 +1,84 @@
+"""
+Backfill PatientTask.task_type for tasks created before the field existed.
+Works in _id order in batches and only touches tasks still missing a type, so it can be
+stopped at any point and rerun (or run by several workers at once) safely.
+Run with: python -m utils.backfill_task_type [--batch-size 1000]
+"""
+import argparse
+import asyncio
+from typing import Optional
+from bson import ObjectId
+from pymongo import UpdateOne
+from motor.motor_asyncio import AsyncIOMotorClient
+from beanie import init_beanie
+from models.patient_task import PatientTask, derive_task_type
+from core.config import settings
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+async def backfill_task_types(batch_size: int = DEFAULT_BATCH_SIZE, pause_seconds: float = 0) -> int:
+    """Set task_type on every task missing one; returns how many tasks were updated"""
+    collection = PatientTask.get_motor_collection()
+    last_id: Optional[ObjectId] = None
+    updated = 0
+    
+    while True:
+        query = {"task_type": None}
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+        # Walk the _id index forward from the last batch instead of re-sorting the remaining tasks
+        batch = await collection.find(query, {"title": 1}).sort("_id", 1).hint([("_id", 1)]).limit(
+            batch_size
+        ).to_list(batch_size)
+        if not batch:
+            break
+        
+        # The task_type filter keeps concurrent runs (or newer writes) from being overwritten
+        result = await collection.bulk_write([
+            UpdateOne(
+                {"_id": task["_id"], "task_type": None},
+                {"$set": {"task_type": derive_task_type(task.get("title"))}}
+            )
+            for task in batch
+        ], ordered=False)
+        updated += result.modified_count
+        last_id = batch[-1]["_id"]
+        
+        if pause_seconds:
+            # Leave room for request traffic when running inside the app
+            await asyncio.sleep(pause_seconds)
+    
+    return updated
+
+
+async def run_on_startup() -> None:
+    """Backfill in the background if any task still lacks a type"""
+    if await PatientTask.get_motor_collection().find_one({"task_type": None}, {"_id": 1}) is None:
+        return
+    try:
+        updated = await backfill_task_types(settings.task_type_backfill_batch_size, pause_seconds=0.05)
+        print(f"✅ Backfilled task_type on {updated} tasks")
+    except Exception as e:
+        # Safe to retry: the next start resumes with the tasks still missing a type
+        print(f"❌ task_type backfill stopped: {e}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Backfill task_type on existing tasks")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+    
+    client = AsyncIOMotorClient(settings.mongodb_url)
+    await init_beanie(
+        database=client[settings.mongodb_db_name],
+        document_models=[PatientTask]
+    )
+    print("🏷️  Backfilling task_type...")
+    updated = await backfill_task_types(args.batch_size)
+    print(f"✅ Backfilled task_type on {updated} tasks")
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,281 @@
+"""
+Bulk data generation shared by the seed scripts and load-test datasets.
+Documents are built in memory and written with chunked insert_many calls;
+each distinct password is hashed only once.
+Run with: python -m utils.datagen --students 10000 --tasks 1000000 --seed 42
+"""
+import argparse
+import asyncio
+import random
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from motor.motor_asyncio import AsyncIOMotorClient
+from beanie import Document, init_beanie
+from models.user import User
+from models.patient_task import PatientTask, derive_task_type
+from models.task_response import TaskResponse
+from models.analytics_log import AnalyticsLog
+from models.student_stats import StudentStats
+from core.config import settings
+from core.security import get_password_hash_async
+from services.leaderboard_service import LeaderboardService
+
+DEFAULT_CHUNK_SIZE = 5000
+
+# Task titles
+TASK_TITLES = [
+    "Post-operative Physiotherapy Plan",
+    "Cardiac Rehabilitation Assessment",
+    "Pediatric Development Evaluation",
+    "Geriatric Balance Assessment",
+    "Sports Injury Rehabilitation",
+    "Neurological Assessment Protocol",
+    "Respiratory Care Plan",
+    "Orthopedic Treatment Plan",
+    "Mental Health Evaluation",
+    "Chronic Pain Management"
+]
+
+# Patient names
+PATIENT_NAMES = [
+    "Mrs. Sarah Kumar", "Mr. James Wilson", "Tommy Chen", "Mrs. Dorothy Evans",
+    "Alex Rodriguez", "Ms. Priya Patel", "Mr. Robert Thompson", "Mrs. Linda Martinez",
+    "David Kim", "Ms. Jennifer Brown", "Mr. Michael Davis", "Mrs. Patricia Johnson"
+]
+
+# Complaints
+COMPLAINTS = [
+    "Post-op knee replacement recovery",
+    "Post-MI cardiac rehabilitation",
+    "Delayed motor development",
+    "Recent falls, balance issues",
+    "ACL reconstruction recovery",
+    "Stroke rehabilitation",
+    "Chronic obstructive pulmonary disease",
+    "Hip fracture recovery",
+    "Anxiety and depression",
+    "Lower back pain management"
+]
+
+PATIENT_NOTES = [
+    None,
+    "Patient requires special attention",
+    "Follow-up needed",
+    "Family history of similar conditions",
+    "Previous treatment history available"
+]
+
+REJECT_REASONS = [
+    "Too busy with other assignments",
+    "Not my area of specialization",
+    "Schedule conflict",
+    "Need more time to prepare"
+]
+
+STATUSES = ["pending", "accepted", "completed", "rejected"]
+DEFAULT_STATUS_WEIGHTS = [0.15, 0.25, 0.55, 0.05]  # pending, accepted, completed, rejected
+
+
+class PasswordHashCache:
+    """Hashes each distinct password once (bcrypt salts make every hash valid for login)"""
+    
+    def __init__(self):
+        self._hashes: Dict[str, str] = {}
+    
+    async def hash(self, password: str) -> str:
+        if password not in self._hashes:
+            self._hashes[password] = await get_password_hash_async(password)
+        return self._hashes[password]
+
+
+def chunked(items: Sequence, size: int) -> Iterable[Sequence]:
+    """Yield consecutive slices of at most size items"""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+async def insert_chunked(documents: List[Document], chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+    """insert_many in chunks, assigning the generated ids back onto the documents"""
+    if not documents:
+        return
+    model = type(documents[0])
+    for chunk in chunked(documents, chunk_size):
+        result = await model.insert_many(list(chunk))
+        for document, inserted_id in zip(chunk, result.inserted_ids):
+            document.id = inserted_id
+
+
+def build_task(
+    rng: random.Random,
+    student_id: str,
+    now: datetime,
+    status: Optional[str] = None,
+    status_weights: Sequence[float] = DEFAULT_STATUS_WEIGHTS,
+    patient_names: Sequence[str] = PATIENT_NAMES,
+    max_days_ago: int = 90
+) -> PatientTask:
+    """Build (not insert) a random task; completed tasks get a 3.0-5.0 score"""
+    status = status or rng.choices(STATUSES, weights=status_weights)[0]
+    complaint = rng.choice(COMPLAINTS)
+    created_date = now - timedelta(days=rng.randint(1, max_days_ago))
+    title = rng.choice(TASK_TITLES)
+    
+    task = PatientTask(
+        title=title,
+        task_type=derive_task_type(title),
+        description=f"Comprehensive assessment and treatment plan for {complaint.lower()}",
+        patient={
+            "name": rng.choice(patient_names),
+            "age": rng.randint(8, 85),
+            "primary_complaint": complaint,
+            "notes": rng.choice(PATIENT_NOTES)
+        },
+        assigned_student_id=student_id,
+        status=status,
+        created_at=created_date
+    )
+    if status == "completed":
+        task.quality_score = round(rng.uniform(3.0, 5.0), 1)
+        # Completed 1-7 days after creation
+        task.completed_at = created_date + timedelta(days=rng.randint(1, 7))
+    return task
+
+
+def build_task_events(
+    rng: random.Random,
+    task: PatientTask,
+    admin_id: str,
+    accept_before_complete: bool = True
+) -> Tuple[List[TaskResponse], AnalyticsLog]:
+    """Build the task responses and audit log an already-inserted task would have produced"""
+    task_id = str(task.id)
+    student_id = task.assigned_student_id
+    responses = []
+    
+    if task.status != "pending":
+        response_time = task.created_at + timedelta(hours=rng.randint(1, 48))
+        if task.status == "completed" and accept_before_complete:
+            responses.append(TaskResponse(
+                task_id=task_id,
+                student_id=student_id,
+                action="accepted",
+                timestamp=task.created_at + timedelta(hours=rng.randint(1, 24))
+            ))
+        responses.append(TaskResponse(
+            task_id=task_id,
+            student_id=student_id,
+            action=task.status,
+            reject_reason=rng.choice(REJECT_REASONS) if task.status == "rejected" else None,
+            timestamp=response_time
+        ))
+    
+    completed = task.status == "completed"
+    log = AnalyticsLog(
+        user_id=admin_id if completed else student_id,
+        task_id=task_id,
+        role="admin" if completed else "student",
+        action=f"task_{task.status}",
+        timestamp=(task.completed_at or task.created_at) if completed else task.created_at,
+        metadata={"title": task.title, "score": task.quality_score} if completed else {}
+    )
+    return responses, log
+
+
+async def insert_tasks_with_events(
+    rng: random.Random,
+    tasks: List[PatientTask],
+    admin_id: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    accept_before_complete: bool = True
+) -> None:
+    """Insert tasks chunk by chunk, each followed by its responses and audit logs"""
+    for chunk in chunked(tasks, chunk_size):
+        chunk = list(chunk)
+        await insert_chunked(chunk, chunk_size)
+        responses, logs = [], []
+        for task in chunk:
+            task_responses, log = build_task_events(rng, task, admin_id, accept_before_complete)
+            responses.extend(task_responses)
+            logs.append(log)
+        await insert_chunked(responses, chunk_size)
+        await insert_chunked(logs, chunk_size)
+
+
+async def generate_dataset(
+    num_students: int,
+    num_tasks: int,
+    seed: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    email_template: str = "loadtest{n:06d}@student.edu",
+    password: str = "student123",
+    max_days_ago: int = 365,
+    rebuild_leaderboard: bool = True
+) -> Dict[str, int]:
+    """Generate a load-test dataset; the same seed always produces the same data.
+    
+    rebuild_leaderboard=False skips the $merge-based student_stats rebuild, for
+    stand-in databases that cannot run it (the caller then builds student_stats).
+    """
+    rng = random.Random(seed)
+    now = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    hashes = PasswordHashCache()
+    
+    admin = await User.find_one(User.email == "admin@institute.edu")
+    if not admin:
+        admin = User(
+            name="Dr. Sarah Chen",
+            email="admin@institute.edu",
+            password_hash=await hashes.hash("admin123"),
+            role="admin"
+        )
+        await admin.insert()
+    admin_id = str(admin.id)
+    
+    password_hash = await hashes.hash(password)
+    students = [
+        User(
+            name=f"Load Student {n}",
+            email=email_template.format(n=n),
+            password_hash=password_hash,
+            role="student"
+        )
+        for n in range(1, num_students + 1)
+    ]
+    await insert_chunked(students, chunk_size)
+    student_ids = [str(s.id) for s in students]
+    
+    # Build tasks one chunk at a time so memory stays bounded for millions of tasks
+    for start in range(0, num_tasks, chunk_size):
+        tasks = [
+            build_task(rng, rng.choice(student_ids), now, max_days_ago=max_days_ago)
+            for _ in range(min(chunk_size, num_tasks - start))
+        ]
+        await insert_tasks_with_events(rng, tasks, admin_id, chunk_size)
+        print(f"  📝 {start + len(tasks)}/{num_tasks} tasks")
+    
+    if rebuild_leaderboard:
+        await LeaderboardService.rebuild()
+    return {"students": len(students), "tasks": num_tasks}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Generate a load-test dataset")
+    parser.add_argument("--students", type=int, default=1000)
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+    
+    client = AsyncIOMotorClient(settings.mongodb_url)
+    await init_beanie(
+        database=client[settings.mongodb_db_name],
+        document_models=[User, PatientTask, TaskResponse, AnalyticsLog, StudentStats]
+    )
+    print(f"🌱 Generating {args.students} students and {args.tasks} tasks (seed {args.seed})...")
+    summary = await generate_dataset(args.students, args.tasks, seed=args.seed, chunk_size=args.chunk_size)
+    print(f"✅ Created {summary['students']} students and {summary['tasks']} tasks")
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
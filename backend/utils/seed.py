@@ -4,15 +4,17 @@ Run with: python -m utils.seed
 """
 import asyncio
 import random
-from datetime import datetime, timedelta
+from datetime import datetime
 from motor.motor_asyncio import AsyncIOMotorClient
 from beanie import init_beanie
 from models.user import User
 from models.patient_task import PatientTask
 from models.task_response import TaskResponse
 from models.analytics_log import AnalyticsLog
+from models.student_stats import StudentStats
 from core.config import settings
-from core.security import get_password_hash
+from services.leaderboard_service import LeaderboardService
+from utils.datagen import PasswordHashCache, build_task, insert_chunked, insert_tasks_with_events
 
 # Random student names
 STUDENT_NAMES = [
@@ -24,48 +26,13 @@ STUDENT_NAMES = [
     "Melissa Baker", "Matthew Nelson", "Deborah Carter", "Anthony Mitchell", "Stephanie Perez"
 ]
 
-# Task titles
-TASK_TITLES = [
-    "Post-operative Physiotherapy Plan",
-    "Cardiac Rehabilitation Assessment",
-    "Pediatric Development Evaluation",
-    "Geriatric Balance Assessment",
-    "Sports Injury Rehabilitation",
-    "Neurological Assessment Protocol",
-    "Respiratory Care Plan",
-    "Orthopedic Treatment Plan",
-    "Mental Health Evaluation",
-    "Chronic Pain Management"
-]
-
-# Patient names
-PATIENT_NAMES = [
-    "Mrs. Sarah Kumar", "Mr. James Wilson", "Tommy Chen", "Mrs. Dorothy Evans",
-    "Alex Rodriguez", "Ms. Priya Patel", "Mr. Robert Thompson", "Mrs. Linda Martinez",
-    "David Kim", "Ms. Jennifer Brown", "Mr. Michael Davis", "Mrs. Patricia Johnson"
-]
-
-# Complaints
-COMPLAINTS = [
-    "Post-op knee replacement recovery",
-    "Post-MI cardiac rehabilitation",
-    "Delayed motor development",
-    "Recent falls, balance issues",
-    "ACL reconstruction recovery",
-    "Stroke rehabilitation",
-    "Chronic obstructive pulmonary disease",
-    "Hip fracture recovery",
-    "Anxiety and depression",
-    "Lower back pain management"
-]
-
 
 async def seed_data():
     """Create initial users, random students, and sample tasks with marks"""
     client = AsyncIOMotorClient(settings.mongodb_url)
     await init_beanie(
         database=client[settings.mongodb_db_name],
-        document_models=[User, PatientTask, TaskResponse, AnalyticsLog]
+        document_models=[User, PatientTask, TaskResponse, AnalyticsLog, StudentStats]
     )
     
     # Check if already seeded
@@ -76,126 +43,55 @@ async def seed_data():
     
     print("🌱 Starting seed process...")
     
+    hashes = PasswordHashCache()
+    
     # Create admin user
     admin = User(
         name="Dr. Sarah Chen",
         email="admin@institute.edu",
-        password_hash=get_password_hash("admin123"),
+        password_hash=await hashes.hash("admin123"),
         role="admin"
     )
     await admin.insert()
     print(f"✅ Created admin: {admin.email} / admin123")
     
-    # Create random students (20-25 students)
+    # Create random students (20-25 students), all sharing one password hash
     num_students = random.randint(20, 25)
     selected_names = random.sample(STUDENT_NAMES, num_students)
-    student_users = []
-    
-    for i, name in enumerate(selected_names, 1):
-        email = f"student{i:02d}@student.edu"
-        student = User(
+    student_hash = await hashes.hash("student123")
+    student_users = [
+        User(
             name=name,
-            email=email,
-            password_hash=get_password_hash("student123"),
+            email=f"student{i:02d}@student.edu",
+            password_hash=student_hash,
             role="student"
         )
-        await student.insert()
-        student_users.append(student)
-        print(f"✅ Created student {i}/{num_students}: {email} / student123")
+        for i, name in enumerate(selected_names, 1)
+    ]
+    await insert_chunked(student_users)
+    for i, student in enumerate(student_users, 1):
+        print(f"✅ Created student {i}/{num_students}: {student.email} / student123")
     
     print(f"\n📚 Created {len(student_users)} students")
     
-    # Create sample tasks with random assignments and marks
+    # Create sample tasks with random assignments and marks (3-8 per student, last 90 days)
     print("\n📝 Creating sample tasks with random marks...")
-    admin_id = str(admin.id)
-    tasks_created = 0
-    
-    # Create tasks for each student (3-8 tasks per student)
-    for student in student_users:
-        num_tasks = random.randint(3, 8)
-        student_id = str(student.id)
-        
-        for _ in range(num_tasks):
-            # Random task details
-            task_title = random.choice(TASK_TITLES)
-            patient_name = random.choice(PATIENT_NAMES)
-            patient_age = random.randint(8, 85)
-            complaint = random.choice(COMPLAINTS)
-            
-            # Random status distribution (more completed tasks for better analytics)
-            status_weights = [0.15, 0.25, 0.55, 0.05]  # pending, accepted, completed, rejected
-            status = random.choices(
-                ["pending", "accepted", "completed", "rejected"],
-                weights=status_weights
-            )[0]
-            
-            # Create task with random date in last 90 days
-            days_ago = random.randint(1, 90)
-            created_date = datetime.utcnow() - timedelta(days=days_ago)
-            
-            task = PatientTask(
-                title=task_title,
-                description=f"Comprehensive assessment and treatment plan for {complaint.lower()}",
-                patient={
-                    "name": patient_name,
-                    "age": patient_age,
-                    "primary_complaint": complaint,
-                    "notes": random.choice([
-                        None,
-                        "Patient requires special attention",
-                        "Follow-up needed",
-                        "Family history of similar conditions",
-                        "Previous treatment history available"
-                    ])
-                },
-                assigned_student_id=student_id,
-                status=status,
-                created_at=created_date
-            )
-            
-            # Add quality score if completed (random between 3.0-5.0)
-            if status == "completed":
-                quality_score = round(random.uniform(3.0, 5.0), 1)
-                task.quality_score = quality_score
-                # Completed 1-7 days after creation
-                task.completed_at = created_date + timedelta(days=random.randint(1, 7))
-            
-            await task.insert()
-            tasks_created += 1
-            
-            # Create task response
-            if status != "pending":
-                action = status
-                response_time = created_date + timedelta(hours=random.randint(1, 48))
-                await TaskResponse(
-                    task_id=str(task.id),
-                    student_id=student_id,
-                    action=action,
-                    reject_reason=random.choice([
-                        "Too busy with other assignments",
-                        "Not my area of specialization",
-                        "Schedule conflict",
-                        "Need more time to prepare"
-                    ]) if status == "rejected" else None,
-                    timestamp=response_time
-                ).insert()
-            
-            # Log analytics
-            log_time = created_date
-            if status == "completed":
-                log_time = task.completed_at or created_date
-            
-            await AnalyticsLog(
-                user_id=admin_id if status == "completed" else student_id,
-                task_id=str(task.id),
-                role="admin" if status == "completed" else "student",
-                action=f"task_{status}",
-                timestamp=log_time,
-                metadata={"title": task_title, "score": task.quality_score} if status == "completed" else {}
-            ).insert()
+    rng = random.Random()
+    now = datetime.utcnow()
+    tasks = [
+        build_task(rng, str(student.id), now)
+        for student in student_users
+        for _ in range(rng.randint(3, 8))
+    ]
+    await insert_tasks_with_events(rng, tasks, str(admin.id), accept_before_complete=False)
+    tasks_created = len(tasks)
     
     print(f"✅ Created {tasks_created} tasks with random marks")
     
+    # Tasks were written directly, so recompute the leaderboard in one pass
+    await LeaderboardService.rebuild()
+    print("✅ Rebuilt student leaderboard")
+    
     # Summary
     print("\n" + "="*60)
     print("🎉 Seeding Complete!")
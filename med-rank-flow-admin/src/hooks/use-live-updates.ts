@@ -0,0 +1,56 @@
+import { useEffect } from 'react';
+import { useQueryClient, type InfiniteData } from '@tanstack/react-query';
+import { api, type LiveEvent, type TaskPage } from '@/services/api';
+
+const TASK_DELTA_EVENTS = ['task_accepted', 'task_rejected', 'task_completed', 'task_scored'];
+
+// Keeps tasks, rankings and analytics current from pushed events instead of polling
+export function useLiveUpdates(enabled = true) {
+  const queryClient = useQueryClient();
+  
+  useEffect(() => {
+    if (!enabled) {
+      return;
+    }
+    
+    return api.events.subscribe((event: LiveEvent) => {
+      if (TASK_DELTA_EVENTS.includes(event.type)) {
+        // Patch the task in whichever loaded page holds it; unloaded pages arrive fresh with "Load more"
+        queryClient.setQueryData<InfiniteData<TaskPage>>(['tasks'], (data) =>
+          data && {
+            ...data,
+            pages: data.pages.map((page) => ({
+              ...page,
+              items: page.items.map((task) => {
+                if (task.id !== event.data.id) {
+                  return task;
+                }
+                return {
+                  ...task,
+                  status: event.data.status,
+                  quality_score: event.data.quality_score ?? undefined,
+                  completed_at: event.data.completed_at ?? undefined,
+                };
+              }),
+            })),
+          }
+        );
+        // Responses move acceptance rates, scores move averages
+        queryClient.invalidateQueries({ queryKey: ['rankings'] });
+        queryClient.invalidateQueries({ queryKey: ['admin-analytics'] });
+        return;
+      }
+      
+      if (event.type === 'leaderboard_updated') {
+        queryClient.invalidateQueries({ queryKey: ['rankings'] });
+        queryClient.invalidateQueries({ queryKey: ['admin-analytics'] });
+        return;
+      }
+      
+      // ready, resync, new tasks and bulk scores: refetch (cheap 304s when nothing changed)
+      queryClient.invalidateQueries({ queryKey: ['tasks'] });
+      queryClient.invalidateQueries({ queryKey: ['rankings'] });
+      queryClient.invalidateQueries({ queryKey: ['admin-analytics'] });
+    });
+  }, [enabled, queryClient]);
+}
@@ -10,7 +10,8 @@ import { Textarea } from '@/components/ui/textarea';
 import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from '@/components/ui/select';
 import { Table, TableBody, TableCell, TableHead, TableHeader, TableRow } from '@/components/ui/table';
 import { useToast } from '@/hooks/use-toast';
-import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
+import { useLiveUpdates } from '@/hooks/use-live-updates';
+import { useQuery, useInfiniteQuery, useMutation, useQueryClient } from '@tanstack/react-query';
 import { PatientTask, StudentRanking, Student, TaskCreateRequest } from '@/types';
 import { api } from '@/services/api';
 import { useNavigate } from 'react-router-dom';
@@ -20,6 +21,7 @@ const AdminDashboard = () => {
   const { toast } = useToast();
   const navigate = useNavigate();
   const queryClient = useQueryClient();
+  useLiveUpdates();
   
   // Form states
   const [taskTitle, setTaskTitle] = useState('');
@@ -30,11 +32,20 @@ const AdminDashboard = () => {
   const [patientNotes, setPatientNotes] = useState('');
   const [selectedStudent, setSelectedStudent] = useState('');
 
-  // Fetch tasks
-  const { data: tasks = [], isLoading: tasksLoading } = useQuery<PatientTask[]>({
+  // Fetch tasks a page at a time, newest first; older pages load on demand
+  const {
+    data: taskPages,
+    isLoading: tasksLoading,
+    fetchNextPage,
+    hasNextPage,
+    isFetchingNextPage,
+  } = useInfiniteQuery({
     queryKey: ['tasks'],
-    queryFn: () => api.tasks.getAll(),
+    queryFn: ({ pageParam }) => api.tasks.getPage({ cursor: pageParam }),
+    initialPageParam: undefined as string | undefined,
+    getNextPageParam: (lastPage) => lastPage.nextCursor ?? undefined,
   });
+  const tasks: PatientTask[] = taskPages?.pages.flatMap((page) => page.items) ?? [];
 
   // Fetch rankings
   const { data: rankings = [], isLoading: rankingsLoading } = useQuery<StudentRanking[]>({
@@ -288,6 +299,7 @@ const AdminDashboard = () => {
                 {tasksLoading ? (
                   <div className="text-center py-8">Loading tasks...</div>
                 ) : (
+                  <>
                   <Table>
                     <TableHeader>
                       <TableRow>
@@ -365,6 +377,18 @@ const AdminDashboard = () => {
                       ))}
                     </TableBody>
                   </Table>
+                  {hasNextPage && (
+                    <div className="flex justify-center pt-4">
+                      <Button
+                        variant="outline"
+                        onClick={() => fetchNextPage()}
+                        disabled={isFetchingNextPage}
+                      >
+                        {isFetchingNextPage ? 'Loading...' : 'Load more'}
+                      </Button>
+                    </div>
+                  )}
+                  </>
                 )}
               </CardContent>
             </Card>
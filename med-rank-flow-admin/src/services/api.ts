@@ -9,10 +9,20 @@ class ApiError extends Error {
   }
 }
 
-async function request<T>(
+interface CachedResponse {
+  etag: string;
+  body: unknown;
+  headers: Record<string, string | null>;
+}
+
+// Last GET response per token + endpoint, revalidated with If-None-Match
+const responseCache = new Map<string, CachedResponse>();
+
+async function send(
   endpoint: string,
-  options: RequestInit = {}
-): Promise<T> {
+  options: RequestInit = {},
+  keepHeaders: string[] = []
+): Promise<{ body: unknown; headers: Record<string, string | null> }> {
   const token = localStorage.getItem('access_token');
   
   const headers: HeadersInit = {
@@ -24,17 +34,152 @@ async function request<T>(
     headers['Authorization'] = `Bearer ${token}`;
   }
   
+  const isGet = !options.method || options.method.toUpperCase() === 'GET';
+  const cacheKey = `${token ?? ''} ${endpoint}`;
+  const cached = isGet ? responseCache.get(cacheKey) : undefined;
+  if (cached) {
+    headers['If-None-Match'] = cached.etag;
+  }
+  
   const response = await fetch(`${API_URL}${endpoint}`, {
     ...options,
     headers,
+    // Revalidation is handled here, so skip the browser's HTTP cache
+    cache: isGet ? 'no-store' : options.cache,
   });
   
+  if (response.status === 304 && cached) {
+    return { body: cached.body, headers: cached.headers };
+  }
+  
   if (!response.ok) {
     const error = await response.json().catch(() => ({ detail: response.statusText }));
     throw new ApiError(response.status, error.detail || 'Request failed');
   }
   
-  return response.json();
+  const body = await response.json();
+  const kept = Object.fromEntries(keepHeaders.map((name) => [name, response.headers.get(name)]));
+  const etag = response.headers.get('ETag');
+  if (isGet && etag) {
+    responseCache.set(cacheKey, { etag, body, headers: kept });
+  } else if (isGet) {
+    // Untagged (e.g. an error fallback): never revalidate against an older copy
+    responseCache.delete(cacheKey);
+  }
+  return { body, headers: kept };
+}
+
+async function request<T>(
+  endpoint: string,
+  options: RequestInit = {}
+): Promise<T> {
+  const { body } = await send(endpoint, options);
+  return body as T;
+}
+
+export interface TaskPageParams {
+  limit?: number;
+  cursor?: string;
+  status?: string;
+  student_id?: string;
+  created_from?: string;
+  created_to?: string;
+  view?: 'full' | 'summary';
+}
+
+export interface TaskPage {
+  items: PatientTask[];
+  nextCursor: string | null;
+}
+
+async function requestTaskPage(params: TaskPageParams = {}): Promise<TaskPage> {
+  const query = new URLSearchParams();
+  Object.entries(params).forEach(([key, value]) => {
+    if (value !== undefined && value !== null && value !== '') {
+      query.set(key, String(value));
+    }
+  });
+  
+  const { body, headers } = await send(`/tasks/admin?${query.toString()}`, {}, ['X-Next-Cursor']);
+  
+  return {
+    items: body as PatientTask[],
+    nextCursor: headers['X-Next-Cursor'],
+  };
+}
+
+export interface LiveEvent {
+  type: string;
+  data: any;
+}
+
+const LIVE_EVENT_TYPES = [
+  'ready',
+  'resync',
+  'task_created',
+  'tasks_created',
+  'task_accepted',
+  'task_rejected',
+  'task_completed',
+  'task_scored',
+  'tasks_scored',
+  'leaderboard_updated',
+];
+
+const EVENTS_RETRY_MS = 5000;
+
+// Server-Sent Events. EventSource cannot send headers, so each connection uses a
+// single-use ticket from POST /events/ticket and the session token stays out of URLs.
+// A spent ticket cannot be reused, so reconnects fetch a new one instead of letting
+// EventSource retry; the server sends 'ready' again after each connect.
+function subscribeToEvents(onEvent: (event: LiveEvent) => void): () => void {
+  if (!localStorage.getItem('access_token') || typeof EventSource === 'undefined') {
+    return () => {};
+  }
+  
+  let source: EventSource | null = null;
+  let retry: ReturnType<typeof setTimeout> | undefined;
+  let closed = false;
+  
+  const listener = (message: MessageEvent) => {
+    onEvent({ type: message.type, data: JSON.parse(message.data) });
+  };
+  const stop = () => {
+    closed = true;
+    clearTimeout(retry);
+    source?.close();
+  };
+  const reconnect = () => {
+    source?.close();
+    if (!closed) {
+      retry = setTimeout(connect, EVENTS_RETRY_MS);
+    }
+  };
+  
+  async function connect() {
+    let ticket: string;
+    try {
+      ({ ticket } = await request<{ ticket: string }>('/events/ticket', { method: 'POST' }));
+    } catch (error) {
+      if (error instanceof ApiError && error.status === 401) {
+        stop();
+      } else {
+        reconnect();
+      }
+      return;
+    }
+    if (closed) {
+      return;
+    }
+    
+    source = new EventSource(`${API_URL}/events/stream?ticket=${encodeURIComponent(ticket)}`);
+    LIVE_EVENT_TYPES.forEach((type) => source?.addEventListener(type, listener));
+    source.addEventListener('unauthorized', stop);
+    source.onerror = reconnect;
+  }
+  
+  connect();
+  return stop;
 }
 
 export const api = {
@@ -55,8 +200,26 @@ export const api = {
       });
     },
     
-    getAll: async () => {
-      return request<PatientTask[]>('/tasks/admin');
+    createBulk: async (tasks: any[]) => {
+      return request<{ created: number; failed: number; results: { index: number; id: string | null; error: string | null }[] }>('/tasks/bulk', {
+        method: 'POST',
+        body: JSON.stringify({ tasks }),
+      });
+    },
+    
+    getPage: async (params: TaskPageParams = {}) => {
+      return requestTaskPage({ limit: 50, ...params });
+    },
+    
+    get: async (taskId: string) => {
+      return request<PatientTask>(`/tasks/${taskId}`);
+    },
+    
+    scoreBulk: async (scores: { task_id: string; quality_score: number }[]) => {
+      return request<{ scored: number; failed: number; results: { index: number; id: string | null; error: string | null }[] }>('/tasks/score/bulk', {
+        method: 'POST',
+        body: JSON.stringify({ scores }),
+      });
     },
     
     score: async (taskId: string, score: number) => {
@@ -86,6 +249,10 @@ export const api = {
       return request<Student[]>('/users/students');
     },
   },
+  
+  events: {
+    subscribe: subscribeToEvents,
+  },
 };
 
 export { ApiError };
@@ -0,0 +1,68 @@
+import { useEffect } from 'react';
+import { useQueryClient } from '@tanstack/react-query';
+import { api, type LiveEvent } from '@/services/api';
+import type { PatientTask } from '@/types';
+
+const TASK_DELTA_EVENTS = ['task_accepted', 'task_rejected', 'task_completed', 'task_scored'];
+// Every student gets leaderboard_updated at once; spread their analytics refetches out
+const LEADERBOARD_REFETCH_SPREAD_MS = 3000;
+
+// Keeps the task list and analytics current from pushed events instead of polling
+export function useLiveUpdates(enabled = true) {
+  const queryClient = useQueryClient();
+  
+  useEffect(() => {
+    if (!enabled) {
+      return;
+    }
+    
+    let leaderboardTimer: ReturnType<typeof setTimeout> | undefined;
+    const unsubscribe = api.events.subscribe((event: LiveEvent) => {
+      if (TASK_DELTA_EVENTS.includes(event.type)) {
+        // Patch the task in place; only refetch if it is not in the cached list
+        let patched = false;
+        queryClient.setQueryData<PatientTask[]>(['tasks'], (tasks) =>
+          tasks?.map((task) => {
+            if (task.id !== event.data.id) {
+              return task;
+            }
+            patched = true;
+            return {
+              ...task,
+              status: event.data.status,
+              quality_score: event.data.quality_score ?? undefined,
+              completed_at: event.data.completed_at ?? undefined,
+            };
+          })
+        );
+        if (!patched) {
+          queryClient.invalidateQueries({ queryKey: ['tasks'] });
+        }
+        if (event.type === 'task_scored') {
+          queryClient.invalidateQueries({ queryKey: ['student-analytics'] });
+        }
+        return;
+      }
+      
+      if (event.type === 'leaderboard_updated') {
+        // Repeats while a refetch is pending fold into it
+        if (leaderboardTimer === undefined) {
+          leaderboardTimer = setTimeout(() => {
+            leaderboardTimer = undefined;
+            queryClient.invalidateQueries({ queryKey: ['student-analytics'] });
+          }, Math.random() * LEADERBOARD_REFETCH_SPREAD_MS);
+        }
+        return;
+      }
+      
+      // ready, resync, new tasks and bulk scores: refetch (cheap 304s when nothing changed)
+      queryClient.invalidateQueries({ queryKey: ['tasks'] });
+      queryClient.invalidateQueries({ queryKey: ['student-analytics'] });
+    });
+    
+    return () => {
+      clearTimeout(leaderboardTimer);
+      unsubscribe();
+    };
+  }, [enabled, queryClient]);
+}
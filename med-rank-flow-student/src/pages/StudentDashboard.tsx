@@ -10,6 +10,7 @@ import {
 } from "@/components/ui/card";
 import { Badge } from "@/components/ui/badge";
 import { useToast } from "@/hooks/use-toast";
+import { useLiveUpdates } from "@/hooks/use-live-updates";
 import { useQuery, useMutation, useQueryClient } from "@tanstack/react-query";
 import { PatientTask } from "@/types";
 import { api } from "@/services/api";
@@ -30,6 +31,7 @@ const StudentDashboard = () => {
   const { toast } = useToast();
   const navigate = useNavigate();
   const queryClient = useQueryClient();
+  useLiveUpdates();
   const [rejectDialogOpen, setRejectDialogOpen] = useState(false);
   const [selectedTaskId, setSelectedTaskId] = useState<string | null>(null);
   const [rejectReason, setRejectReason] = useState("");